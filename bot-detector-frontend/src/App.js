@@ -80,7 +80,7 @@ function App() {
     setBatchError(null);
 
     try {
-      const response = await fetch('http://127.0.0.1:8000/predict/batch', {
+      const response = await fetch('http://127.0.0.1:8000/predict/batch?fields=prediction,confidence,bot_probability,human_probability', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ usernames }),
@@ -388,7 +388,7 @@ function App() {
                     try {
                       const formData = new FormData();
                       formData.append('file', file);
-                      const response = await fetch('http://127.0.0.1:8000/predict/csv', {
+                      const response = await fetch('http://127.0.0.1:8000/predict/csv?fields=prediction,confidence,bot_probability,human_probability', {
                         method: 'POST',
                         body: formData,
                       });
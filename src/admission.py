@@ -0,0 +1,170 @@
+# src/admission.py
+import threading
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; maps to HTTP 429"""
+
+    def __init__(self, reason, retry_after=1):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TrafficClass:
+    """
+    Scheduling settings for one kind of traffic.
+      weight        share of freed slots when several classes are waiting
+      max_running   cap on slots this class may hold at once
+      queue_budget  seconds a request may wait before it is shed (None = wait)
+      client_limit  running + queued requests allowed per client
+      max_queued    requests allowed to wait across all clients (None = no cap);
+                    beyond it requests are shed at once. Waiting requests each
+                    hold a server thread, so this bounds how many a class can take.
+    """
+
+    def __init__(self, name, weight, max_running, queue_budget, client_limit, max_queued=None):
+        self.name = name
+        self.weight = weight
+        self.max_running = max_running
+        self.queue_budget = queue_budget
+        self.client_limit = client_limit
+        self.max_queued = max_queued
+
+        self.queue = deque()
+        self.running = 0
+        self.current_weight = 0
+        self.admitted = 0
+        self.rejected = defaultdict(int)
+        self.waits = deque(maxlen=1000)
+
+
+class _Ticket:
+    __slots__ = ("client", "enqueued_at", "granted")
+
+    def __init__(self, client):
+        self.client = client
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Shares a fixed number of scoring slots between traffic classes.
+    Freed slots go to waiting classes by smooth weighted round robin, so a
+    saturating bulk class cannot starve interactive requests, and requests
+    that wait longer than their class budget are shed.
+    """
+
+    def __init__(self, slots, classes):
+        self.slots = slots
+        self.classes = {c.name: c for c in classes}
+        self.in_use = 0
+        self._per_client = defaultdict(int)
+        self._cond = threading.Condition()
+
+    def _eligible(self):
+        return [c for c in self.classes.values() if c.queue and c.running < c.max_running]
+
+    def _dispatch(self):
+        """Grant free slots to waiting tickets; caller holds the lock"""
+        granted = False
+        while self.in_use < self.slots:
+            eligible = self._eligible()
+            if not eligible:
+                break
+            total = sum(c.weight for c in eligible)
+            for c in eligible:
+                c.current_weight += c.weight
+            chosen = max(eligible, key=lambda c: c.current_weight)
+            chosen.current_weight -= total
+
+            ticket = chosen.queue.popleft()
+            ticket.granted = True
+            chosen.running += 1
+            chosen.admitted += 1
+            chosen.waits.append(time.monotonic() - ticket.enqueued_at)
+            self.in_use += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, class_name, client):
+        """Hold one slot of `class_name` for the duration of the block"""
+        traffic = self.classes[class_name]
+        client_key = (class_name, client)
+
+        with self._cond:
+            if self._per_client[client_key] >= traffic.client_limit:
+                traffic.rejected["client_limit"] += 1
+                raise AdmissionRejected(f"Too many concurrent {class_name} requests for this client")
+
+            ticket = _Ticket(client)
+            traffic.queue.append(ticket)
+            self._per_client[client_key] += 1
+            self._dispatch()
+
+            if not ticket.granted and traffic.max_queued is not None and len(traffic.queue) > traffic.max_queued:
+                traffic.queue.remove(ticket)
+                traffic.rejected["queue_full"] += 1
+                self._release_client(client_key)
+                raise AdmissionRejected(
+                    f"{class_name} queue is full",
+                    retry_after=max(1, int(traffic.queue_budget or 1))
+                )
+
+            deadline = None
+            if traffic.queue_budget is not None:
+                deadline = ticket.enqueued_at + traffic.queue_budget
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    traffic.queue.remove(ticket)
+                    traffic.rejected["queue_timeout"] += 1
+                    self._release_client(client_key)
+                    raise AdmissionRejected(
+                        f"{class_name} queue time exceeded {traffic.queue_budget}s",
+                        retry_after=max(1, int(traffic.queue_budget))
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                traffic.running -= 1
+                self.in_use -= 1
+                self._release_client(client_key)
+                self._dispatch()
+
+    def _release_client(self, client_key):
+        self._per_client[client_key] -= 1
+        if self._per_client[client_key] == 0:
+            del self._per_client[client_key]
+
+    def metrics(self):
+        """Per-class queue depth, occupancy, counters and queue wait percentiles"""
+        with self._cond:
+            snapshot = {}
+            for c in self.classes.values():
+                waits = sorted(c.waits)
+
+                def percentile(q):
+                    return waits[min(int(q * len(waits)), len(waits) - 1)] if waits else 0.0
+
+                snapshot[c.name] = {
+                    "queued": len(c.queue),
+                    "running": c.running,
+                    "max_running": c.max_running,
+                    "max_queued": c.max_queued,
+                    "weight": c.weight,
+                    "admitted": c.admitted,
+                    "rejected": dict(c.rejected),
+                    "wait_p50_seconds": percentile(0.5),
+                    "wait_p99_seconds": percentile(0.99)
+                }
+            return {"slots": self.slots, "in_use": self.in_use, "classes": snapshot}
@@ -1,10 +1,17 @@
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+from contextlib import ExitStack
 import csv
 import io
-from src.inference import BotDetector
+import os
+import threading
+from src.admission import AdmissionController, AdmissionRejected, TrafficClass
+from src.jobs import JobManager
+from src.profiling import PROFILE_HEADER, TraceRecorder, span
+from src.serialization import parse_fields, check_format, slim_results, render
 
 app = FastAPI()
 
@@ -17,7 +24,105 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-detector = BotDetector()
+# The detector pulls in torch and the model artifacts, so it is created on
+# startup (or on first use when BOT_SHIELD_PRELOAD=0), never at import time
+_detector = None
+_detector_lock = threading.Lock()
+
+def get_detector():
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                from src.inference import BotDetector
+                _detector = BotDetector(use_cascade=os.getenv('BOT_SHIELD_CASCADE', '') == '1',
+                                        ensemble_path=os.getenv('BOT_SHIELD_ENSEMBLE') or None)
+    return _detector
+
+# Recent verdicts, held as compact columns keyed by hashed username
+_verdicts = None
+_verdicts_lock = threading.Lock()
+
+def get_verdict_store():
+    global _verdicts
+    if _verdicts is None:
+        with _verdicts_lock:
+            if _verdicts is None:
+                from src.verdict_store import VerdictStore
+                _verdicts = VerdictStore(capacity=int(os.getenv('BOT_SHIELD_VERDICT_CAPACITY', '2000000')))
+    return _verdicts
+
+def record_verdicts(results):
+    """Remember the verdicts of rows scored from a live profile (not the dummy fallback)"""
+    scored = [row for row in results if row["error"] is None and row["live"]]
+    if scored:
+        get_verdict_store().record([row["username"] for row in scored],
+                                   [row["bot_probability"] for row in scored],
+                                   [1 if row["prediction"] == "BOT" else 0 for row in scored])
+    return results
+
+@app.on_event("startup")
+def preload_detector():
+    if os.getenv('BOT_SHIELD_PRELOAD', '1') != '0':
+        get_detector()
+
+# Interactive calls, synchronous bulk uploads and background job chunks
+# share the detector through a fixed number of scoring slots. Sync endpoints
+# wait for a slot on a server thread, so the bulk queue is capped to keep
+# queued uploads from taking the threads interactive requests need.
+slots = int(os.getenv('BOT_SHIELD_SLOTS', '4'))
+admission = AdmissionController(slots, [
+    TrafficClass("interactive", weight=4, max_running=slots,
+                 queue_budget=float(os.getenv('BOT_SHIELD_INTERACTIVE_BUDGET', '2')), client_limit=8),
+    TrafficClass("bulk", weight=1, max_running=max(1, slots // 2),
+                 queue_budget=float(os.getenv('BOT_SHIELD_BULK_BUDGET', '30')), client_limit=2,
+                 max_queued=int(os.getenv('BOT_SHIELD_BULK_QUEUE', str(slots)))),
+    TrafficClass("jobs", weight=1, max_running=1, queue_budget=None, client_limit=slots),
+])
+
+# Opt-in request traces (see src/profiling.py)
+traces = TraceRecorder()
+
+def client_id(request: Request):
+    """Clients are identified by X-Client-Id, falling back to the remote address"""
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "unknown")
+
+@app.exception_handler(AdmissionRejected)
+def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(status_code=429, content={"detail": exc.reason},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+def score_job_chunk(usernames):
+    with admission.admit("jobs", "jobs"):
+        results = score_usernames(usernames)
+    return apply_decisions(record_verdicts(results))
+
+# The job manager creates its directory and resumes unfinished jobs (which
+# load the detector), so like the detector it is built on startup, not import
+_jobs = None
+_jobs_lock = threading.Lock()
+
+def get_jobs():
+    global _jobs
+    if _jobs is None:
+        with _jobs_lock:
+            if _jobs is None:
+                _jobs = JobManager(
+                    score_fn=score_job_chunk,
+                    root=os.getenv('BOT_SHIELD_JOBS_DIR', 'jobs'),
+                    max_workers=int(os.getenv('BOT_SHIELD_JOB_WORKERS', '1')),
+                    chunk_size=int(os.getenv('BOT_SHIELD_JOB_CHUNK_SIZE', '100'))
+                )
+    return _jobs
+
+@app.on_event("startup")
+def start_jobs():
+    get_jobs()
+
+@app.on_event("shutdown")
+def stop_jobs():
+    if _jobs is not None:
+        _jobs.shutdown()
 
 class PredictRequest(BaseModel):
     username: str
@@ -25,9 +130,72 @@ class PredictRequest(BaseModel):
 class BatchPredictRequest(BaseModel):
     usernames: List[str]
 
+@app.get("/metrics/drift")
+def drift_metrics():
+    detector = get_detector()
+    if detector.drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is disabled (no drift reference)")
+    return detector.drift_monitor.report()
+
+@app.get("/metrics/cascade")
+def cascade_metrics():
+    detector = get_detector()
+    if detector.prefilter is None:
+        raise HTTPException(status_code=404, detail="Cascade mode is disabled (set BOT_SHIELD_CASCADE=1)")
+    return detector.prefilter.metrics()
+
+@app.get("/metrics/admission")
+def admission_metrics():
+    return admission.metrics()
+
+@app.get("/metrics/verdicts")
+def verdict_metrics():
+    return get_verdict_store().metrics()
+
+def cached_verdict(username, max_age):
+    """Compact response from a verdict scored within max_age seconds, or None"""
+    found, bot_prob, prediction, scored_at = get_verdict_store().lookup([username], max_age)
+    if not found[0]:
+        return None
+    bot_prob = float(bot_prob[0])
+    return {
+        "username": username,
+        "prediction": "BOT" if prediction[0] == 1 else "HUMAN",
+        "confidence": bot_prob if prediction[0] == 1 else 1 - bot_prob,
+        "bot_probability": bot_prob,
+        "human_probability": 1 - bot_prob,
+        "top_features": None,
+        "profile_data": None,
+        "radar_data": None,
+        "uncertainty": None,
+        "live": True,
+        "cached": True,
+        "scored_at": int(scored_at[0])
+    }
+
 @app.post("/predict")
-def predict(req: PredictRequest):
-    prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data = detector.predict(req.username)
+def predict(req: PredictRequest, request: Request, response: Response, max_age: Optional[float] = None):
+    """
+    With max_age (seconds), a recent verdict is returned without rescoring.
+    Traced requests get an X-Trace-Id header; fetch the trace from /traces/{id}.
+    """
+    if max_age is not None:
+        cached = cached_verdict(req.username, max_age)
+        if cached is not None:
+            return cached
+
+    trace = traces.start("predict", requested=request.headers.get(PROFILE_HEADER) == "1")
+    try:
+        with ExitStack() as slot:
+            with span(trace, "admission"):
+                slot.enter_context(admission.admit("interactive", client_id(request)))
+            prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data, uncertainty, live = get_detector().predict(req.username, trace=trace)
+        if live:
+            get_verdict_store().record([req.username], [bot_prob], [prediction])
+    finally:
+        if trace is not None:
+            traces.finish(trace)
+            response.headers["X-Trace-Id"] = trace.trace_id
     return {
         "username": req.username,
         "prediction": "BOT" if prediction == 1 else "HUMAN",
@@ -36,81 +204,186 @@ def predict(req: PredictRequest):
         "human_probability": human_prob,
         "top_features": top_features,
         "profile_data": profile_data,
-        "radar_data": radar_data
+        "radar_data": radar_data,
+        "uncertainty": uncertainty,
+        "live": live
     }
 
-@app.post("/predict/batch")
-def predict_batch(req: BatchPredictRequest):
-    results = []
-    for username in req.usernames:
-        username = username.strip()
-        if not username:
-            continue
-        try:
-            prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data = detector.predict(username)
-            results.append({
-                "username": username,
-                "prediction": "BOT" if prediction == 1 else "HUMAN",
-                "confidence": confidence,
-                "bot_probability": bot_prob,
-                "human_probability": human_prob,
-                "top_features": top_features,
-                "profile_data": profile_data,
-                "radar_data": radar_data,
-                "error": None
-            })
-        except Exception as e:
-            results.append({
-                "username": username,
-                "prediction": None,
-                "confidence": None,
-                "bot_probability": None,
-                "human_probability": None,
-                "top_features": None,
-                "profile_data": None,
-                "radar_data": None,
-                "error": str(e)
-            })
-    return {"results": results}
+def result_row(username, result):
+    """Batch result row from a predict() tuple, or from the exception raised for this user"""
+    if isinstance(result, Exception):
+        return {
+            "username": username,
+            "prediction": None,
+            "decision": None,
+            "confidence": None,
+            "bot_probability": None,
+            "human_probability": None,
+            "top_features": None,
+            "profile_data": None,
+            "radar_data": None,
+            "uncertainty": None,
+            "live": None,
+            "error": str(result)
+        }
+    prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data, uncertainty, live = result
+    return {
+        "username": username,
+        "prediction": "BOT" if prediction == 1 else "HUMAN",
+        "decision": None,
+        "confidence": confidence,
+        "bot_probability": bot_prob,
+        "human_probability": human_prob,
+        "top_features": top_features,
+        "profile_data": profile_data,
+        "radar_data": radar_data,
+        "uncertainty": uncertainty,
+        "live": live,
+        "error": None
+    }
 
-@app.post("/predict/csv")
-async def predict_csv(file: UploadFile = File(...)):
-    contents = await file.read()
-    text = contents.decode("utf-8")
-    reader = csv.reader(io.StringIO(text))
+def score_usernames(usernames):
+    """Score usernames in one batched pass into result rows, capturing errors per row"""
+    try:
+        results = get_detector().predict_batch(usernames)
+    except Exception as e:
+        results = [e] * len(usernames)
+    return [result_row(username, result) for username, result in zip(usernames, results)]
+
+def parse_usernames_csv(contents):
+    """Collect usernames from every cell of an uploaded CSV, skipping header names"""
+    reader = csv.reader(io.StringIO(contents.decode("utf-8")))
     usernames = []
     for row in reader:
         for cell in row:
             cell = cell.strip().lstrip("@")
             if cell and cell.lower() not in ("username", "user", "screen_name", "handle"):
                 usernames.append(cell)
-    results = []
-    for username in usernames:
-        if not username:
-            continue
-        try:
-            prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data = detector.predict(username)
-            results.append({
-                "username": username,
-                "prediction": "BOT" if prediction == 1 else "HUMAN",
-                "confidence": confidence,
-                "bot_probability": bot_prob,
-                "human_probability": human_prob,
-                "top_features": top_features,
-                "profile_data": profile_data,
-                "radar_data": radar_data,
-                "error": None
-            })
-        except Exception as e:
-            results.append({
-                "username": username,
-                "prediction": None,
-                "confidence": None,
-                "bot_probability": None,
-                "human_probability": None,
-                "top_features": None,
-                "profile_data": None,
-                "radar_data": None,
-                "error": str(e)
-            })
-    return {"results": results}
+    return usernames
+
+def parse_abstain_band(abstain):
+    """Parse "low,high" into an abstain band of calibrated bot probabilities"""
+    if not abstain:
+        return None
+    try:
+        low, high = (float(x) for x in abstain.split(","))
+    except ValueError:
+        raise ValueError(f"abstain must be 'low,high', got: {abstain}")
+    if not 0.0 <= low <= high <= 1.0:
+        raise ValueError(f"abstain band must satisfy 0 <= low <= high <= 1, got: {abstain}")
+    return low, high
+
+def apply_decisions(results, threshold=0.5, abstain_band=None):
+    """Fill the decision column for all scored rows in one vectorized pass"""
+    scored = [row for row in results if row["error"] is None]
+    if scored:
+        from src.calibration import decide
+
+        decisions = decide([row["bot_probability"] for row in scored], threshold, abstain_band)
+        for row, decision in zip(scored, decisions):
+            row["decision"] = str(decision)
+    return results
+
+def batch_response(usernames, fields, format, client, threshold=0.5, abstain=None):
+    """Score usernames and encode the slimmed batch payload"""
+    try:
+        selected = parse_fields(fields)
+        check_format(format)
+        abstain_band = parse_abstain_band(abstain)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with admission.admit("bulk", client):
+        results = score_usernames(usernames)
+    apply_decisions(record_verdicts(results), threshold, abstain_band)
+    return render(slim_results(results, selected), format)
+
+@app.post("/predict/batch")
+def predict_batch(req: BatchPredictRequest, request: Request, fields: Optional[str] = None, format: str = "json",
+                  threshold: float = 0.5, abstain: Optional[str] = None):
+    usernames = [u.strip() for u in req.usernames if u.strip()]
+    return batch_response(usernames, fields, format, client_id(request), threshold, abstain)
+
+@app.post("/predict/csv")
+def predict_csv(request: Request, file: UploadFile = File(...), fields: Optional[str] = None, format: str = "json",
+                threshold: float = 0.5, abstain: Optional[str] = None):
+    usernames = parse_usernames_csv(file.file.read())
+    return batch_response(usernames, fields, format, client_id(request), threshold, abstain)
+
+@app.post("/verdicts/lookup")
+def lookup_verdicts(req: BatchPredictRequest, max_age: Optional[float] = None, flagged: bool = False,
+                    format: str = "json"):
+    """
+    Which of these usernames were scored recently, and how.
+    With flagged=true only usernames with a BOT verdict are returned.
+    """
+    try:
+        check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    usernames = [u.strip() for u in req.usernames if u.strip()]
+    found, bot_prob, prediction, scored_at = get_verdict_store().lookup(usernames, max_age)
+    keep = found & (prediction == 1) if flagged else found
+    rows = [{
+        "username": usernames[i],
+        "prediction": "BOT" if prediction[i] == 1 else "HUMAN",
+        "bot_probability": float(bot_prob[i]),
+        "scored_at": int(scored_at[i])
+    } for i in keep.nonzero()[0]]
+    missing = [usernames[i] for i in (~found).nonzero()[0]]
+    return render({"results": rows, "missing": missing}, format)
+
+def submit_job(usernames, fields):
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_jobs().submit(usernames, selected)
+
+@app.post("/jobs", status_code=202)
+def create_job(req: BatchPredictRequest, fields: Optional[str] = None):
+    usernames = [u.strip() for u in req.usernames if u.strip()]
+    return submit_job(usernames, fields)
+
+@app.post("/jobs/csv", status_code=202)
+def create_csv_job(file: UploadFile = File(...), fields: Optional[str] = None):
+    return submit_job(parse_usernames_csv(file.file.read()), fields)
+
+@app.get("/traces")
+def list_traces():
+    return traces.summaries()
+
+@app.get("/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """One recent trace in Chrome trace format (load in chrome://tracing or Perfetto)"""
+    trace = traces.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired trace: {trace_id}")
+    return trace.to_chrome()
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    status = get_jobs().status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return status
+
+@app.get("/jobs/{job_id}/results")
+def job_results(job_id: str):
+    """
+    Result rows as NDJSON; partial while the job is still running.
+    Only the rows status.json counts as processed are sent, so the body
+    matches Content-Length even while the worker keeps appending.
+    """
+    status = job_status(job_id)
+    jobs = get_jobs()
+    if not jobs.results_path(job_id).exists():
+        raise HTTPException(status_code=404, detail=f"No results yet for job {job_id} ({status['status']})")
+    length, body = jobs.read_results(job_id, status["processed"])
+    return StreamingResponse(body, media_type="application/x-ndjson", headers={
+        "Content-Length": str(length),
+        "Content-Disposition": f'attachment; filename="{job_id}.jsonl"',
+        "X-Job-Status": status["status"],
+        "X-Job-Rows": str(status["processed"]),
+    })
@@ -0,0 +1,65 @@
+# src/baselines.py
+import torch
+from pathlib import Path
+
+
+def load_normalized_training_data():
+    """Load the training split and normalize it with the serving scaler"""
+    print("Loading training data...")
+    data = torch.load(Path("data") / "processed_data.pt", weights_only=False)
+    scaler = torch.load(Path("data") / "scaler.pt")
+
+    X_train = (data['X_train'] - scaler['feature_mean']) / (scaler['feature_std'] + 1e-8)
+    y_train = data['y_train']
+
+    print(f"✓ Normalized {X_train.shape[0]} training samples")
+    return X_train, y_train
+
+
+def select_background(X, num_background=16, random_seed=42):
+    """
+    Pick a small, representative SHAP background set.
+    Uses k-means centroids so each row covers a different region of the data.
+    """
+    from sklearn.cluster import KMeans
+
+    print(f"\nClustering into {num_background} background rows...")
+    kmeans = KMeans(n_clusters=num_background, n_init=10, random_state=random_seed)
+    kmeans.fit(X.numpy())
+
+    background = torch.tensor(kmeans.cluster_centers_, dtype=torch.float32)
+    print(f"✓ Background shape: {background.shape}")
+    return background
+
+
+def class_profiles(X, y, num_classes=2):
+    """Mean normalized feature vector per class (0=human, 1=bot)"""
+    profiles = torch.stack([X[y == c].mean(dim=0) for c in range(num_classes)])
+    print(f"✓ Class profiles shape: {profiles.shape}")
+    return profiles
+
+
+def build_baselines(num_background=16, output_path="models/explainer_baseline.pt"):
+    """Build and save the explainer background and per-class profiles"""
+    print("="*50)
+    print("BUILDING EXPLANATION BASELINES")
+    print("="*50)
+
+    X_train, y_train = load_normalized_training_data()
+
+    background = select_background(X_train, num_background=num_background)
+    profiles = class_profiles(X_train, y_train)
+
+    torch.save({
+        'background': background,
+        'class_profiles': profiles
+    }, output_path)
+
+    print(f"\n✅ Baselines saved to {output_path}")
+    print("="*50)
+
+    return background, profiles
+
+
+if __name__ == "__main__":
+    build_baselines()
@@ -0,0 +1,158 @@
+# src/benchmark_serving.py
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_TOKEN = "fake-token"
+FAKE_DATASET_ID = "fake-dataset"
+
+# Fixed profiles with locked predictions (tests/golden_predictions.json).
+# No date_joined, so account age does not move with the clock.
+FIXED_PROFILES = {
+    "fixed_bot": {
+        "followers": 150, "following": 2500, "posts_count": 8000, "is_verified": False,
+        "biography": "Dummy bio for tests.", "profile_name": "dummy_01", "external_link": "https://example.com"
+    },
+    "fixed_human": {
+        "followers": 12345, "following": 310, "posts_count": 2100, "subscriptions": 3, "is_verified": True,
+        "biography": "Writer, runner, coffee person. Opinions are my own.", "profile_name": "Jane Doe",
+        "location": "Lisbon", "external_link": "https://janedoe.blog"
+    },
+    "fixed_empty": {},
+    "fixed_zero_counts": {"followers": 0, "following": 0, "posts_count": 0, "profile_name": "x"},
+}
+
+# Usernames with this prefix make the fake server fail, so the detector falls back to dummy features
+FAILING_PREFIX = "fail_"
+
+# /predict/batch must sustain at least this many users per second at each batch size
+THROUGHPUT_FLOORS = {10: 20.0, 100: 50.0, 1000: 100.0}
+
+
+def fake_profile(username):
+    """Profile the fake server returns: fixed for known names, derived from a hash otherwise"""
+    if username in FIXED_PROFILES:
+        return {"id": username, **FIXED_PROFILES[username]}
+    h = zlib.crc32(username.encode("utf-8"))
+    return {
+        "id": username,
+        "followers": h % 50000,
+        "following": (h >> 8) % 5000,
+        "posts_count": (h >> 4) % 20000,
+        "is_verified": h % 7 == 0,
+        "biography": "b" * (h % 160),
+        "profile_name": username,
+        "external_link": "https://example.com" if h % 3 == 0 else ""
+    }
+
+
+class _FakeBrightDataHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Authorization") != f"Bearer {FAKE_TOKEN}":
+            self._send(401, {"error": "unauthorized"})
+            return
+        inputs = json.loads(body).get("input", [])
+        if any(item["user_name"].startswith(FAILING_PREFIX) for item in inputs):
+            self._send(500, {"error": "scrape failed"})
+            return
+        self._send(200, [fake_profile(item["user_name"]) for item in inputs])
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def fake_brightdata():
+    """Local stand-in for the Bright Data scrape endpoint; yields its URL"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeBrightDataHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/datasets/v3/scrape"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def serving_client():
+    """
+    TestClient for src.app with a fresh detector scraping the fake server.
+    Per-request diagnostics are silenced; warnings still get through.
+    """
+    from fastapi.testclient import TestClient
+    import src.app
+    from src.diagnostics import logger
+
+    overrides = {"BRIGHT_DATA_API_TOKEN": FAKE_TOKEN, "BRIGHT_DATA_DATASET_ID": FAKE_DATASET_ID,
+                 "BOT_SHIELD_CASCADE": "", "BOT_SHIELD_ENSEMBLE": ""}
+    with fake_brightdata() as url:
+        overrides["BRIGHT_DATA_API_URL"] = url
+        saved = {name: os.environ.get(name) for name in overrides}
+        level = logger.level
+        os.environ.update(overrides)
+        logger.setLevel(logging.WARNING)
+        src.app._detector = None
+        src.app._verdicts = None
+        try:
+            src.app.get_detector()
+            yield TestClient(src.app.app)
+        finally:
+            src.app._detector = None
+            src.app._verdicts = None
+            logger.setLevel(level)
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def measure_batch(client, size, runs=3):
+    """Best users/second for /predict/batch at one batch size"""
+    usernames = [f"bench_user_{i}" for i in range(size)]
+    best = 0.0
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.post("/predict/batch", json={"usernames": usernames})
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        best = max(best, size / elapsed)
+    return best
+
+
+def benchmark_serving(sizes=tuple(THROUGHPUT_FLOORS)):
+    """Throughput of /predict/batch against the fake scraper at several batch sizes"""
+    print("="*50)
+    print("SERVING BENCHMARK")
+    print("="*50)
+
+    results = {}
+    with serving_client() as client:
+        for size in sizes:
+            results[size] = measure_batch(client, size)
+            floor = THROUGHPUT_FLOORS.get(size)
+            print(f"batch {size:>5}: {results[size]:8.1f} users/s" + (f" (floor {floor:.0f})" if floor else ""))
+    print("="*50)
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark_serving()
+    if any(results[size] < floor for size, floor in THROUGHPUT_FLOORS.items() if size in results):
+        sys.exit(1)
@@ -0,0 +1,66 @@
+# src/benchmark_startup.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Import of src.app must stay under this many seconds (median of fresh interpreters)
+IMPORT_BUDGET_SECONDS = 1.5
+
+# Modules that must not be loaded by `import src.app`
+DEFERRED_MODULES = ["torch", "shap", "numpy", "sklearn", "requests", "dotenv"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.app
+imported = time.perf_counter()
+if {load_detector}:
+    src.app.get_detector()
+ready = time.perf_counter()
+print(json.dumps({{
+    "import_seconds": imported - start,
+    "ready_seconds": ready - start,
+    "loaded": [m for m in {deferred!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(load_detector=False):
+    """Run one fresh interpreter and time `import src.app` (and detector startup)"""
+    code = PROBE.format(load_detector=load_detector, deferred=DEFERRED_MODULES)
+    env = {**os.environ, "BOT_SHIELD_QUIET": "1"}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=REPO_ROOT, env=env)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def benchmark_startup(runs=5):
+    """Median import and time-to-ready over fresh interpreters"""
+    print("="*50)
+    print("STARTUP BENCHMARK")
+    print("="*50)
+
+    imports = [measure() for _ in range(runs)]
+    ready = [measure(load_detector=True) for _ in range(runs)]
+
+    import_median = statistics.median(r["import_seconds"] for r in imports)
+    ready_median = statistics.median(r["ready_seconds"] for r in ready)
+    loaded = sorted({m for r in imports for m in r["loaded"]})
+
+    print(f"import src.app:         {import_median*1000:.0f} ms (budget {IMPORT_BUDGET_SECONDS*1000:.0f} ms)")
+    print(f"import + BotDetector(): {ready_median*1000:.0f} ms")
+    print(f"Heavy modules loaded at import: {', '.join(loaded) or 'none'}")
+    print("="*50)
+
+    return {"import_seconds": import_median, "ready_seconds": ready_median, "loaded": loaded}
+
+
+if __name__ == "__main__":
+    result = benchmark_startup()
+    if result["import_seconds"] > IMPORT_BUDGET_SECONDS or result["loaded"]:
+        sys.exit(1)
@@ -0,0 +1,109 @@
+# src/calibration.py
+import torch
+import numpy as np
+
+DECISIONS = np.array(["HUMAN", "BOT", "ABSTAIN"])
+
+
+def fit_temperature(logits, labels, max_iter=200):
+    """Fit a single softmax temperature by minimizing NLL on held-out logits"""
+    log_t = torch.zeros(1, requires_grad=True)
+    optimizer = torch.optim.LBFGS([log_t], lr=0.1, max_iter=max_iter)
+    criterion = torch.nn.CrossEntropyLoss()
+
+    def closure():
+        optimizer.zero_grad()
+        loss = criterion(logits / log_t.exp(), labels)
+        loss.backward()
+        return loss
+
+    optimizer.step(closure)
+    return log_t.exp().item()
+
+
+class Calibrator:
+    """
+    Maps model logits to calibrated class probabilities.
+    Temperature scaling is always applied; an optional isotonic map is
+    fitted on top of the temperature-scaled bot probability.
+    """
+
+    def __init__(self, temperature=1.0, isotonic_x=None, isotonic_y=None):
+        self.temperature = temperature
+        self.isotonic_x = isotonic_x
+        self.isotonic_y = isotonic_y
+
+    @property
+    def method(self):
+        return "isotonic" if self.isotonic_x is not None else "temperature"
+
+    @classmethod
+    def fit(cls, logits, labels, method="temperature"):
+        """Fit on held-out (N, 2) logits and (N,) labels"""
+        calibrator = cls(temperature=fit_temperature(logits, labels))
+        if method == "isotonic":
+            from sklearn.isotonic import IsotonicRegression
+
+            bot_prob = torch.softmax(logits / calibrator.temperature, dim=1)[:, 1].numpy()
+            iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+            iso.fit(bot_prob, labels.numpy())
+            calibrator.isotonic_x = torch.tensor(iso.X_thresholds_, dtype=torch.float32)
+            calibrator.isotonic_y = torch.tensor(iso.y_thresholds_, dtype=torch.float32)
+        elif method != "temperature":
+            raise ValueError(f"Unknown calibration method: {method}")
+        return calibrator
+
+    def probabilities(self, logits):
+        """(N, 2) logits -> (N, 2) calibrated [human, bot] probabilities"""
+        probs = torch.softmax(logits / self.temperature, dim=1)
+        if self.isotonic_x is None:
+            return probs
+        bot = np.interp(probs[:, 1].cpu().numpy(), self.isotonic_x.numpy(), self.isotonic_y.numpy())
+        bot = torch.tensor(bot, dtype=probs.dtype, device=probs.device)
+        return torch.stack([1 - bot, bot], dim=1)
+
+    def state_dict(self):
+        return {
+            'method': self.method,
+            'temperature': self.temperature,
+            'isotonic_x': self.isotonic_x,
+            'isotonic_y': self.isotonic_y
+        }
+
+    @classmethod
+    def from_state_dict(cls, state):
+        return cls(state['temperature'], state['isotonic_x'], state['isotonic_y'])
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_state_dict(torch.load(path))
+
+    def save(self, path):
+        torch.save(self.state_dict(), path)
+
+
+def decide(bot_probs, threshold=0.5, abstain_band=None):
+    """
+    Turn a batch of calibrated bot probabilities into decisions.
+    Probabilities inside abstain_band=(low, high) get ABSTAIN and should go
+    to explanation/review; the rest are BOT when >= threshold, else HUMAN.
+    """
+    bot_probs = np.asarray(bot_probs, dtype=np.float64)
+    codes = (bot_probs >= threshold).astype(np.int64)
+    if abstain_band is not None:
+        low, high = abstain_band
+        codes[(bot_probs > low) & (bot_probs < high)] = 2
+    return DECISIONS[codes]
+
+
+def expected_calibration_error(bot_probs, labels, num_bins=10):
+    """ECE of the bot probability over equal-width bins"""
+    bot_probs = np.asarray(bot_probs)
+    labels = np.asarray(labels)
+    bins = np.minimum((bot_probs * num_bins).astype(np.int64), num_bins - 1)
+    ece = 0.0
+    for b in range(num_bins):
+        mask = bins == b
+        if mask.any():
+            ece += mask.mean() * abs(bot_probs[mask].mean() - labels[mask].mean())
+    return ece
@@ -0,0 +1,232 @@
+# src/cascade.py
+import threading
+import torch
+import numpy as np
+from pathlib import Path
+
+from src.features import FEATURE_NAMES, NUM_FEATURES
+from src.model import create_model
+
+# Few, strongly separating inputs for the first stage
+PREFILTER_FEATURES = ["Followers", "Following", "Is Verified", "Account Age", "Follower Ratio", "Ratio Score"]
+PREFILTER_INDICES = [FEATURE_NAMES.index(name) for name in PREFILTER_FEATURES]
+
+
+class Prefilter:
+    """
+    First cascade stage: logistic regression on a handful of normalized features.
+    Rows whose bot probability is <= low or >= high are settled here;
+    everything in between goes on to the MLP and SHAP explanation.
+    """
+
+    def __init__(self, weight, bias, low, high, feature_indices=PREFILTER_INDICES):
+        self.weight = weight
+        self.bias = bias
+        self.low = low
+        self.high = high
+        self.feature_indices = list(feature_indices)
+        self.counts = {"settled_human": 0, "settled_bot": 0, "escalated": 0}
+        self._lock = threading.Lock()
+
+    def logits(self, features):
+        """(N, 23) normalized features -> (N,) first-stage bot logit"""
+        x = features[:, self.feature_indices]
+        return x @ self.weight.to(x.device) + self.bias
+
+    def bot_probability(self, features):
+        """(N, 23) normalized features -> (N,) calibrated first-stage bot probability"""
+        return torch.sigmoid(self.logits(features))
+
+    def calibrate(self, features, labels):
+        """
+        Platt scaling on held-out rows: fit sigmoid(a * logit + c) to the labels
+        and fold a and c into the weights, so bot_probability is calibrated
+        and the saved artifact keeps its format.
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        with torch.no_grad():
+            z = self.logits(features).cpu().numpy().reshape(-1, 1)
+        platt = LogisticRegression(C=1e6, max_iter=1000).fit(z, labels)
+        a, c = float(platt.coef_[0][0]), float(platt.intercept_[0])
+        self.weight = self.weight * a
+        self.bias = self.bias * a + c
+        return a, c
+
+    def settle(self, bot_prob):
+        """Boolean mask of rows settled by the prefilter, and its counters updated"""
+        human = bot_prob <= self.low
+        bot = bot_prob >= self.high
+        settled = human | bot
+        with self._lock:
+            self.counts["settled_human"] += int(human.sum())
+            self.counts["settled_bot"] += int(bot.sum())
+            self.counts["escalated"] += int((~settled).sum())
+        return settled
+
+    def metrics(self):
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        return {
+            **counts,
+            "low": self.low,
+            "high": self.high,
+            "settled_fraction": (counts["settled_human"] + counts["settled_bot"]) / total if total else 0.0
+        }
+
+    def save(self, path):
+        torch.save({
+            'feature_indices': self.feature_indices,
+            'weight': self.weight,
+            'bias': self.bias,
+            'low': self.low,
+            'high': self.high
+        }, path)
+
+    @classmethod
+    def load(cls, path):
+        state = torch.load(path)
+        return cls(state['weight'], state['bias'], state['low'], state['high'], state['feature_indices'])
+
+
+def cascade_predictions(prefilter_prob, mlp_pred, low, high):
+    """Final labels when the prefilter settles the confident rows"""
+    pred = mlp_pred.copy()
+    pred[prefilter_prob <= low] = 0
+    pred[prefilter_prob >= high] = 1
+    return pred
+
+
+def tune_thresholds(prefilter_prob, mlp_pred, labels, max_f1_drop=0.005, min_confidence=0.9):
+    """
+    Pick (low, high) that settle the most rows while keeping cascade F1
+    within max_f1_drop of the full model on the same rows. Settled rows
+    must be at least min_confidence sure of their class, so
+    low <= 1 - min_confidence < 0.5 <= min_confidence <= high always holds
+    and a settled label agrees with decide() on the same probability.
+    """
+    from sklearn.metrics import f1_score
+
+    if not 0.5 <= min_confidence <= 1.0:
+        raise ValueError(f"min_confidence must be in [0.5, 1], got {min_confidence}")
+
+    target = f1_score(labels, mlp_pred) - max_f1_drop
+    # Quantiles of the probabilities, plus the confidence bounds themselves
+    candidates = np.unique(np.concatenate([
+        np.quantile(prefilter_prob, np.linspace(0, 1, 41)), [1 - min_confidence, min_confidence]
+    ]))
+    lows = [c for c in candidates if c <= 1 - min_confidence and c < 0.5]
+    highs = [c for c in candidates if c >= min_confidence]
+
+    best = (0.0, 1.0, 0.0)
+    for low in [-1.0, *lows]:
+        for high in [2.0, *highs]:
+            pred = cascade_predictions(prefilter_prob, mlp_pred, low, high)
+            settled = np.mean((prefilter_prob <= low) | (prefilter_prob >= high))
+            if settled > best[2] and f1_score(labels, pred) >= target:
+                best = (float(low), float(high), float(settled))
+    return best
+
+
+def fit_prefilter(output_path="models/prefilter.pt", max_f1_drop=0.005, min_confidence=0.9, random_seed=42):
+    """Train the first stage, calibrate it, tune its thresholds against the MLP and save it"""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import f1_score
+
+    from src.calibration import Calibrator, expected_calibration_error
+
+    print("="*50)
+    print("TRAINING CASCADE PREFILTER")
+    print("="*50)
+
+    data = torch.load(Path("data") / "processed_data.pt", weights_only=False)
+    scaler = torch.load(Path("data") / "scaler.pt")
+
+    def normalize(X):
+        return (X - scaler['feature_mean']) / (scaler['feature_std'] + 1e-8)
+
+    X_train, y_train = normalize(data['X_train']), data['y_train']
+    X_test, y_test = normalize(data['X_test']), data['y_test']
+
+    # The MLP may have seen all of X_train, so calibration and thresholds come
+    # from the X_test half train.py --calibrate-only fits on; the other half
+    # reports the result
+    generator = torch.Generator().manual_seed(random_seed)
+    indices = torch.randperm(X_test.shape[0], generator=generator)
+    num_cal = int(X_test.shape[0] * 0.5)
+    cal_idx, eval_idx = indices[:num_cal], indices[num_cal:]
+
+    print(f"\nFitting logistic regression on: {', '.join(PREFILTER_FEATURES)}")
+    clf = LogisticRegression(max_iter=1000)
+    clf.fit(X_train[:, PREFILTER_INDICES].numpy(), y_train.numpy())
+    prefilter = Prefilter(
+        weight=torch.tensor(clf.coef_[0], dtype=torch.float32),
+        bias=float(clf.intercept_[0]), low=0.0, high=1.0
+    )
+
+    uncalibrated = prefilter.bot_probability(X_test[eval_idx]).numpy()
+    a, c = prefilter.calibrate(X_test[cal_idx], y_test[cal_idx].numpy())
+    calibrated = prefilter.bot_probability(X_test[eval_idx]).numpy()
+    print(f"✓ Platt scaling: sigmoid({a:.4f} * logit + {c:.4f})")
+    print(f"✓ Evaluation half ECE: {expected_calibration_error(uncalibrated, y_test[eval_idx]):.4f} -> "
+          f"{expected_calibration_error(calibrated, y_test[eval_idx]):.4f}")
+
+    model = create_model(input_dim=NUM_FEATURES)
+    model.load_state_dict(torch.load(Path("models") / "bot_detector_mlp.pt", weights_only=True))
+    model.eval()
+    calibration_path = Path("models") / "calibration.pt"
+    calibrator = Calibrator.load(calibration_path) if calibration_path.exists() else Calibrator()
+
+    def stages(X):
+        # The escalated label as served: calibrated MLP probability at decide()'s threshold
+        with torch.no_grad():
+            mlp_pred = (calibrator.probabilities(model(X))[:, 1] >= 0.5).long().numpy()
+            return prefilter.bot_probability(X).numpy(), mlp_pred
+
+    cal_prob, cal_mlp = stages(X_test[cal_idx])
+    low, high, settled = tune_thresholds(cal_prob, cal_mlp, y_test[cal_idx].numpy(), max_f1_drop, min_confidence)
+    prefilter.low, prefilter.high = low, high
+    print(f"✓ Thresholds: settle HUMAN <= {low:.4f}, BOT >= {high:.4f}")
+    print(f"✓ Calibration half rows settled by prefilter: {settled*100:.1f}%")
+
+    eval_prob, eval_mlp = stages(X_test[eval_idx])
+    y_eval = y_test[eval_idx].numpy()
+    eval_pred = cascade_predictions(eval_prob, eval_mlp, low, high)
+    settled_human, settled_bot = eval_prob <= low, eval_prob >= high
+    print(f"\nEvaluation half ({len(eval_idx)} samples):")
+    print(f"  Full model F1: {f1_score(y_eval, eval_mlp):.4f}")
+    print(f"  Cascade F1:    {f1_score(y_eval, eval_pred):.4f}")
+    print(f"  Settled early: {np.mean(settled_human | settled_bot)*100:.1f}%")
+    if settled_human.any():
+        print(f"  Settled HUMAN precision: {np.mean(y_eval[settled_human] == 0):.4f}")
+    if settled_bot.any():
+        print(f"  Settled BOT precision:   {np.mean(y_eval[settled_bot] == 1):.4f}")
+
+    prefilter.save(output_path)
+    print(f"\n✅ Prefilter saved to {output_path}")
+    print("="*50)
+    return prefilter
+
+
+    low, high, settled = tune_thresholds(val_prob, val_mlp, y_train[val_idx].numpy(), max_f1_drop)
+    prefilter.low, prefilter.high = low, high
+    print(f"✓ Thresholds: settle HUMAN <= {low:.4f}, BOT >= {high:.4f}")
+    print(f"✓ Validation rows settled by prefilter: {settled*100:.1f}%")
+
+    test_prob, test_mlp = stages(X_test)
+    test_pred = cascade_predictions(test_prob, test_mlp, low, high)
+    test_settled = np.mean((test_prob <= low) | (test_prob >= high))
+    print(f"\nTest Set:")
+    print(f"  Full model F1: {f1_score(y_test.numpy(), test_mlp):.4f}")
+    print(f"  Cascade F1:    {f1_score(y_test.numpy(), test_pred):.4f}")
+    print(f"  Settled early: {test_settled*100:.1f}%")
+
+    prefilter.save(output_path)
+    print(f"\n✅ Prefilter saved to {output_path}")
+    print("="*50)
+    return prefilter
+
+
+if __name__ == "__main__":
+    fit_prefilter()
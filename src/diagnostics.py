@@ -0,0 +1,33 @@
+# src/diagnostics.py
+"""
+Logging for the serving path.
+
+By default every diagnostic line is logged to stdout, as the detector has
+always printed them. With BOT_SHIELD_QUIET=1 per-request diagnostics are only
+emitted for a sampled fraction of requests (BOT_SHIELD_LOG_SAMPLE_RATE,
+default 1%), so busy servers do not serialize on stdout writes. Startup
+messages, warnings and errors are always logged.
+"""
+import logging
+import os
+import random
+import sys
+
+logger = logging.getLogger("bot_shield")
+
+QUIET = os.getenv('BOT_SHIELD_QUIET', '') == '1'
+SAMPLE_RATE = float(os.getenv('BOT_SHIELD_LOG_SAMPLE_RATE', '0.01' if QUIET else '1.0'))
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def sampled():
+    """Whether the current request should emit per-request diagnostics"""
+    if SAMPLE_RATE >= 1.0:
+        return True
+    return random.random() < SAMPLE_RATE
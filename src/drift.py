@@ -0,0 +1,160 @@
+# src/drift.py
+import threading
+import torch
+import numpy as np
+
+from src.baselines import load_normalized_training_data
+from src.diagnostics import logger
+
+
+def build_reference(num_bins=10, output_path="data/drift_reference.pt"):
+    """
+    Save per-feature training histograms over fixed bins in normalized space.
+    Inner edges are evenly spaced on [-3, 3]; the outer bins are open-ended.
+    """
+    print("="*50)
+    print("BUILDING DRIFT REFERENCE")
+    print("="*50)
+
+    X_train, _ = load_normalized_training_data()
+    edges = torch.linspace(-3, 3, num_bins - 1)
+
+    bins = torch.searchsorted(edges, X_train.T.contiguous())
+    expected = torch.stack([torch.bincount(b, minlength=num_bins) for b in bins]).float()
+    expected = expected / X_train.shape[0]
+
+    torch.save({
+        'edges': edges,
+        'expected': expected
+    }, output_path)
+
+    print(f"✓ Histograms: {expected.shape[0]} features x {num_bins} bins")
+    print(f"\n✅ Drift reference saved to {output_path}")
+    print("="*50)
+
+    return edges, expected
+
+
+class DriftMonitor:
+    """
+    Online drift check of live normalized features against training data.
+    Each observation updates exponentially decayed per-feature histograms and
+    moments in O(features x bins), so recent traffic dominates the comparison.
+    Batches are folded in with one vectorized update (observe_batch).
+    """
+
+    def __init__(self, edges, expected, feature_names, half_life=5000,
+                 psi_threshold=0.2, check_every=1000, min_samples=200):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.expected = np.clip(np.asarray(expected, dtype=np.float64), 1e-6, None)
+        self.expected_cdf = np.cumsum(self.expected, axis=1)[:, :-1]
+        self.feature_names = feature_names
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.psi_threshold = psi_threshold
+        self.check_every = check_every
+        self.min_samples = min_samples
+
+        num_features, num_bins = self.expected.shape
+        self.counts = np.zeros((num_features, num_bins))
+        self.weight = 0.0
+        self.mean = np.zeros(num_features)
+        self.var = np.zeros(num_features)
+        self.observed = 0
+        self.alerts = []
+        self._rows = np.arange(num_features)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, feature_names, **kwargs):
+        reference = torch.load(path)
+        return cls(reference['edges'].numpy(), reference['expected'].numpy(), feature_names, **kwargs)
+
+    def observe(self, features):
+        """Fold one normalized feature vector into the live statistics"""
+        self.observe_batch(np.asarray(features, dtype=np.float64)[None, :])
+
+    def observe_batch(self, features):
+        """
+        Fold an (N, features) batch of normalized rows into the live statistics.
+        Same result as N observe() calls: row i carries weight decay**(N-1-i),
+        histograms take one bincount, and the moments are merged in one step.
+        """
+        x = np.asarray(features, dtype=np.float64)
+        n = x.shape[0]
+        if n == 0:
+            return
+        num_features, num_bins = self.counts.shape
+        weights = self.decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+        batch_weight = weights.sum()
+
+        bins = np.searchsorted(self.edges, x)
+        flat = (self._rows * num_bins + bins).ravel()
+        batch_counts = np.bincount(flat, weights=np.repeat(weights, num_features),
+                                   minlength=num_features * num_bins).reshape(num_features, num_bins)
+
+        # Weighted mean and spread of the batch, merged with the decayed running moments
+        batch_mean = weights @ x / batch_weight
+        batch_m2 = weights @ (x - batch_mean) ** 2
+
+        with self._lock:
+            carried = self.decay ** n
+            old_weight = self.weight * carried
+            self.counts = self.counts * carried + batch_counts
+            self.weight = old_weight + batch_weight
+
+            delta = batch_mean - self.mean
+            m2 = self.var * old_weight + batch_m2 + delta * delta * old_weight * batch_weight / self.weight
+            self.mean = self.mean + delta * batch_weight / self.weight
+            self.var = m2 / self.weight
+
+            before = self.observed
+            self.observed += n
+            check = self.observed // self.check_every > before // self.check_every
+        if check:
+            self.check()
+
+    def report(self):
+        """PSI, KS distance and moment shift per feature against training"""
+        with self._lock:
+            counts = self.counts.copy()
+            weight = self.weight
+            mean = self.mean.copy()
+            std = np.sqrt(self.var)
+            observed = self.observed
+
+        features = []
+        if weight > 0:
+            actual = np.clip(counts / weight, 1e-6, None)
+            psi = ((actual - self.expected) * np.log(actual / self.expected)).sum(axis=1)
+            ks = np.abs(np.cumsum(counts / weight, axis=1)[:, :-1] - self.expected_cdf).max(axis=1)
+            for i, name in enumerate(self.feature_names):
+                features.append({
+                    "feature": name,
+                    "psi": float(psi[i]),
+                    "ks": float(ks[i]),
+                    "mean": float(mean[i]),
+                    "std": float(std[i]),
+                    "drifted": bool(psi[i] > self.psi_threshold)
+                })
+
+        return {
+            "observed": observed,
+            "effective_samples": float(weight),
+            "psi_threshold": self.psi_threshold,
+            "drifted_features": [f["feature"] for f in features if f["drifted"]],
+            "features": features
+        }
+
+    def check(self):
+        """Raise alerts for drifted features once enough traffic was seen"""
+        if self.weight < self.min_samples:
+            return []
+        drifted = self.report()["drifted_features"]
+        self.alerts = drifted
+        if drifted:
+            logger.warning("⚠ Feature drift detected (PSI > %s): %s", self.psi_threshold, ", ".join(drifted))
+        return drifted
+
+
+if __name__ == "__main__":
+    build_reference()
@@ -0,0 +1,171 @@
+# src/ensemble.py
+import argparse
+import torch
+import torch.nn as nn
+
+from src.calibration import Calibrator
+from src.features import FEATURE_NAMES, NUM_FEATURES
+from src.model import create_model
+
+
+def fold_member(model, feature_indices=None):
+    """
+    Eval-mode BotDetectorMLP -> three (weight (in, out), bias (out,)) pairs over all 23 features.
+    Each BatchNorm follows a ReLU, so its affine map is folded into the next Linear;
+    dropout is a no-op at inference. Features outside the member's subset get zero weight.
+    """
+    linear1, _, bn1, _, linear2, _, bn2, _, linear3 = model.network
+
+    def bn_affine(bn):
+        scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+        return scale, bn.bias - bn.running_mean * scale
+
+    with torch.no_grad():
+        indices = list(range(NUM_FEATURES)) if feature_indices is None else list(feature_indices)
+        w1 = torch.zeros(NUM_FEATURES, linear1.out_features)
+        w1[indices] = linear1.weight.t()
+        s1, t1 = bn_affine(bn1)
+        s2, t2 = bn_affine(bn2)
+        return [
+            (w1, linear1.bias.clone()),
+            ((linear2.weight * s1).t().contiguous(), linear2.bias + linear2.weight @ t1),
+            ((linear3.weight * s2).t().contiguous(), linear3.bias + linear3.weight @ t2),
+        ]
+
+
+class StackedMLP(nn.Module):
+    """
+    M folded members as (M, in, out) weight stacks, evaluated together
+    with one batched contraction per layer over the shared (N, 23) input.
+    Activations are laid out (N, M, hidden): the batch axis stays first,
+    as SHAP's DeepExplainer splits inputs from background rows along dim 0.
+    """
+
+    def __init__(self, folded):
+        super().__init__()
+        for layer in range(3):
+            self.register_buffer(f"w{layer + 1}", torch.stack([member[layer][0] for member in folded]))
+            self.register_buffer(f"b{layer + 1}", torch.stack([member[layer][1] for member in folded]))
+        # Separate modules so SHAP sees each nonlinearity once
+        self.relu1 = nn.ReLU()
+        self.relu2 = nn.ReLU()
+
+    @property
+    def num_members(self):
+        return self.w1.shape[0]
+
+    def _logits(self, x):
+        """(N, 23) -> (N, M, 2) logits of every member"""
+        h = self.relu1(torch.einsum("nd,mdh->nmh", x, self.w1) + self.b1)
+        h = self.relu2(torch.einsum("nmd,mdh->nmh", h, self.w2) + self.b2)
+        return torch.einsum("nmd,mdh->nmh", h, self.w3) + self.b3
+
+    def member_logits(self, x):
+        """(N, 23) -> (M, N, 2) logits of every member"""
+        return self._logits(x).transpose(0, 1)
+
+    def forward(self, x):
+        """Mean member logits (N, 2); this is the module SHAP explains"""
+        return self._logits(x).mean(dim=1)
+
+
+class Ensemble:
+    """
+    Several BotDetectorMLP members (seeds, feature subsets) served as one model.
+    Probabilities are the mean of the members' calibrated probabilities;
+    disagreement is the standard deviation of their bot probabilities.
+    """
+
+    def __init__(self, members):
+        # members: [{'state_dict', 'feature_indices' (or None), 'calibration' (Calibrator state or None)}]
+        self.members = members
+        folded = []
+        self.calibrators = []
+        for member in members:
+            indices = member['feature_indices']
+            model = create_model(input_dim=NUM_FEATURES if indices is None else len(indices))
+            model.load_state_dict(member['state_dict'])
+            model.eval()
+            folded.append(fold_member(model, indices))
+            state = member['calibration']
+            self.calibrators.append(Calibrator.from_state_dict(state) if state is not None else Calibrator())
+        self.model = StackedMLP(folded)
+        self.model.eval()
+
+    @property
+    def num_members(self):
+        return len(self.members)
+
+    def to(self, device):
+        self.model.to(device)
+        return self
+
+    def probabilities(self, features):
+        """(N, 23) normalized features -> mean [human, bot] probabilities (N, 2) and disagreement (N,)"""
+        logits = self.model.member_logits(features)
+        probs = torch.stack([calibrator.probabilities(member_logits)
+                             for calibrator, member_logits in zip(self.calibrators, logits)])
+        return probs.mean(dim=0), probs[:, :, 1].std(dim=0, unbiased=False)
+
+    def save(self, path):
+        torch.save({'members': self.members}, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(torch.load(path)['members'])
+
+    @classmethod
+    def from_checkpoints(cls, checkpoints):
+        """
+        Build from (model_path, calibration_path or None, feature names or None) triples,
+        where feature names select the subset that member was trained on.
+        """
+        members = []
+        for model_path, calibration_path, feature_names in checkpoints:
+            members.append({
+                'state_dict': torch.load(model_path, map_location='cpu', weights_only=True),
+                'feature_indices': None if feature_names is None else [FEATURE_NAMES.index(n) for n in feature_names],
+                'calibration': Calibrator.load(calibration_path).state_dict() if calibration_path else None
+            })
+        return cls(members)
+
+
+def check_folding(ensemble, num_rows=256):
+    """Largest gap between fused member logits and each member run on its own"""
+    x = torch.randn(num_rows, NUM_FEATURES)
+    with torch.no_grad():
+        fused = ensemble.model.member_logits(x)
+        gap = 0.0
+        for i, member in enumerate(ensemble.members):
+            indices = member['feature_indices']
+            model = create_model(input_dim=NUM_FEATURES if indices is None else len(indices))
+            model.load_state_dict(member['state_dict'])
+            model.eval()
+            inputs = x if indices is None else x[:, indices]
+            gap = max(gap, (model(inputs) - fused[i]).abs().max().item())
+    return gap
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack trained MLP checkpoints into one ensemble artifact")
+    parser.add_argument("members", nargs="+", metavar="MODEL[:CALIBRATION]",
+                        help="Member checkpoint, optionally with its calibration file")
+    parser.add_argument("--output", default="models/ensemble.pt")
+    args = parser.parse_args()
+
+    print("="*50)
+    print("PACKING MLP ENSEMBLE")
+    print("="*50)
+
+    checkpoints = []
+    for spec in args.members:
+        model_path, _, calibration_path = spec.partition(":")
+        checkpoints.append((model_path, calibration_path or None, None))
+    ensemble = Ensemble.from_checkpoints(checkpoints)
+
+    print(f"✓ {ensemble.num_members} members folded and stacked")
+    print(f"✓ Max |fused - member| logit gap: {check_folding(ensemble):.2e}")
+    ensemble.save(args.output)
+    print(f"\n✅ Ensemble saved to {args.output}")
+    print("  Serve it with: BOT_SHIELD_ENSEMBLE=" + args.output)
+    print("="*50)
@@ -1,8 +1,10 @@
 # src/feature_extraction.py
 import torch
-import numpy as np
 from pathlib import Path
 
+from src.features import transform_mgtab
+from src.graph_features import build_graph_features
+
 def load_mgtab_data():
     """Load MGTAB tensor data"""
     print("Loading MGTAB data...")
@@ -38,44 +40,25 @@ def extract_raw_features(features):
 def add_derived_features(features):
     """
     Add derived features to improve bot detection
-    Assumes features has at least: followers, following, posts
+    Derived features come from the shared schema in src/features.py,
+    so training uses exactly the transforms applied at serving time
     """
     print("\nAdding derived features...")
-    
-    # Extract key features (adjust indices based on actual MGTAB structure)
-    # Typical MGTAB structure: [followers, following, statuses, ...]
-    followers = features[:, 0] if features.shape[1] > 0 else torch.ones(features.shape[0])
-    following = features[:, 1] if features.shape[1] > 1 else torch.ones(features.shape[0])
-    posts = features[:, 2] if features.shape[1] > 2 else torch.ones(features.shape[0])
-    
-    # Derived feature 1: Follower-to-Following Ratio (most important)
-    follower_ratio = followers / (following + 1e-6)
-    
-    # Derived feature 2: Following-to-Follower Ratio
-    following_ratio = following / (followers + 1e-6)
-    
-    # Derived feature 3: Bot Score Composite
-    # Combines ratio extremes, posting frequency signals
-    ratio_score = torch.clamp(torch.abs(torch.log10(follower_ratio + 1e-6)), 0, 3)
-    
-    # Stack derived features
-    derived = torch.stack([
-        follower_ratio,
-        following_ratio,
-        ratio_score
-    ], dim=1)
-    
-    # Concatenate with original features
-    features_extended = torch.cat([features, derived], dim=1)
-    
-    print(f"✓ Added 3 derived features")
+
+    features_extended = transform_mgtab(features)
+
+    num_derived = features_extended.shape[1] - features.shape[1]
+    print(f"✓ Added {num_derived} derived features")
     print(f"✓ Final feature shape: {features_extended.shape}")
-    
+
     return features_extended
 
-def prepare_dataset(test_size=0.2, random_seed=42):
+def prepare_dataset(test_size=0.2, random_seed=42, include_graph=False):
     """
     Prepare complete dataset with train/test split
+    With include_graph=True, neighborhood aggregates over the MGTAB relations
+    are also cached to data/graph_features.pt for offline analysis; the
+    model's 23 inputs do not include them (see src/graph_features.py)
     """
     print("="*50)
     print("PREPARING MGTAB DATASET")
@@ -111,16 +94,25 @@ def prepare_dataset(test_size=0.2, random_seed=42):
     print(f"✓ Train set: {X_train.shape[0]} samples")
     print(f"✓ Test set: {X_test.shape[0]} samples")
     print(f"✓ Feature dimension: {X_train.shape[1]}")
-    
-    # Save processed data
-    data_dir = Path("data")
-    torch.save({
+
+    processed = {
         'X_train': X_train,
         'y_train': y_train,
         'X_test': X_test,
         'y_test': y_test,
         'num_features': X_train.shape[1]
-    }, data_dir / "processed_data.pt")
+    }
+
+    # Graph features: only train labels may feed the neighbor bot fraction
+    if include_graph:
+        train_mask = torch.zeros(num_samples, dtype=torch.bool)
+        train_mask[train_indices] = True
+        graph = build_graph_features(raw_features, labels, train_mask)
+        print(f"✓ Graph feature dimension: {len(graph.feature_names())}")
+
+    # Save processed data
+    data_dir = Path("data")
+    torch.save(processed, data_dir / "processed_data.pt")
     
     print(f"\n✅ Processed data saved to {data_dir / 'processed_data.pt'}")
     print("="*50)
@@ -128,4 +120,6 @@ def prepare_dataset(test_size=0.2, random_seed=42):
     return X_train, y_train, X_test, y_test
 
 if __name__ == "__main__":
-    prepare_dataset()
+    # Run from the repo root: python -m src.feature_extraction [--graph]
+    import sys
+    prepare_dataset(include_graph="--graph" in sys.argv)
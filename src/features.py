@@ -0,0 +1,165 @@
+# src/features.py
+"""
+Single source of truth for the 23 model features.
+
+Each feature is declared once with its name, where it comes from and how it
+is transformed. The same declarations are compiled into vectorized batch
+transforms for serving (Bright Data profile dicts) and for training data
+prep (MGTAB feature columns).
+"""
+import torch
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+
+def log_count(x):
+    """log10(x + 1) for positive values, 0 otherwise"""
+    return np.where(x > 0, np.log10(np.maximum(x, 0) + 1), 0.0)
+
+
+def flag(x):
+    return (x != 0).astype(np.float64)
+
+
+def account_age_scaled(days):
+    """Account age is not log-transformed, only scaled to match training"""
+    return days / 10000.0
+
+
+def follower_ratio(followers, following):
+    return log_count(followers / (following + 1e-6))
+
+
+def following_ratio(followers, following):
+    return log_count(following / (followers + 1e-6))
+
+
+def ratio_score(followers, following):
+    return np.minimum(np.abs(np.log10(followers / (following + 1e-6) + 1e-6)), 3.0)
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    One model input.
+    Base features read `source` (a profile column) at serving time and
+    `mgtab_column` at training time. Derived features combine the `inputs`
+    columns with the same transform in both places, but see transform_mgtab:
+    the inputs are on different scales, so the values are not comparable.
+    """
+    name: str
+    source: Optional[str] = None
+    transform: Optional[Callable] = None
+    mgtab_column: Optional[int] = None
+    inputs: Tuple[str, ...] = ()
+    placeholder: bool = False
+
+
+FEATURES = [
+    Feature("Followers", source="followers", transform=log_count, mgtab_column=0),
+    Feature("Following", source="following", transform=log_count, mgtab_column=1),
+    Feature("Posts Count", source="posts_count", transform=log_count, mgtab_column=2),
+    Feature("Is Verified", source="is_verified", transform=flag, mgtab_column=3),
+    Feature("Account Age", source="account_age_days", transform=account_age_scaled, mgtab_column=4),
+    Feature("Subscriptions", source="subscriptions", transform=log_count, mgtab_column=5),
+    Feature("Description Length", source="biography_length", transform=log_count, mgtab_column=6),
+    Feature("Screen Name Length", source="profile_name_length", transform=log_count, mgtab_column=7),
+    Feature("Has URL", source="external_link_length", transform=flag, mgtab_column=8),
+    Feature("Geo Enabled", source="location_length", transform=flag, mgtab_column=9),
+    # MGTAB columns with no Bright Data equivalent; always 0 when serving
+    *[Feature(f"F{i + 1}", mgtab_column=i, placeholder=True) for i in range(10, 20)],
+    Feature("Follower Ratio", transform=follower_ratio, inputs=("followers", "following")),
+    Feature("Following Ratio", transform=following_ratio, inputs=("followers", "following")),
+    Feature("Ratio Score", transform=ratio_score, inputs=("followers", "following")),
+]
+
+FEATURE_NAMES = [f.name for f in FEATURES]
+NUM_FEATURES = len(FEATURES)
+PLACEHOLDER_INDICES = [i for i, f in enumerate(FEATURES) if f.placeholder]
+
+# Profile column -> MGTAB column, for derived features at training time
+MGTAB_COLUMNS = {f.source: f.mgtab_column for f in FEATURES if f.source is not None}
+
+DEFAULT_ACCOUNT_AGE_DAYS = 365
+
+
+def _account_age_days(date_joined, now):
+    if not date_joined:
+        return DEFAULT_ACCOUNT_AGE_DAYS
+    try:
+        join_date = datetime.fromisoformat(date_joined.replace('Z', '+00:00'))
+        if now is None:
+            current = datetime.now(join_date.tzinfo)
+        elif join_date.tzinfo is None:
+            current = now.replace(tzinfo=None)
+        else:
+            current = now if now.tzinfo is not None else now.replace(tzinfo=join_date.tzinfo)
+        return (current - join_date).days
+    except (ValueError, TypeError, AttributeError):
+        return DEFAULT_ACCOUNT_AGE_DAYS
+
+
+def profile_columns(profiles, now=None):
+    """
+    Pull the raw source columns out of Bright Data profile dicts.
+    This is the only per-row Python loop; everything after it is vectorized.
+    """
+    def column(values):
+        return np.array(values, dtype=np.float64)
+
+    return {
+        "followers": column([p.get('followers', 0) or 0 for p in profiles]),
+        "following": column([p.get('following', 0) or 0 for p in profiles]),
+        "posts_count": column([p.get('posts_count', 0) or 0 for p in profiles]),
+        "subscriptions": column([p.get('subscriptions', 0) or 0 for p in profiles]),
+        "is_verified": column([1 if p.get('is_verified', False) else 0 for p in profiles]),
+        "account_age_days": column([_account_age_days(p.get('date_joined', ''), now) for p in profiles]),
+        "biography_length": column([len(p.get('biography') or '') for p in profiles]),
+        "profile_name_length": column([len(p.get('profile_name') or '') for p in profiles]),
+        "external_link_length": column([len(p.get('external_link') or '') for p in profiles]),
+        "location_length": column([len(p.get('location') or '') for p in profiles]),
+    }
+
+
+def transform_columns(columns):
+    """Apply every feature transform to a dict of source columns -> (N, 23) float32"""
+    num_rows = len(next(iter(columns.values())))
+    out = []
+    for feature in FEATURES:
+        if feature.placeholder:
+            out.append(np.zeros(num_rows))
+        elif feature.inputs:
+            out.append(feature.transform(*(columns[name] for name in feature.inputs)))
+        else:
+            out.append(feature.transform(columns[feature.source]))
+    return np.stack(out, axis=1).astype(np.float32)
+
+
+def transform_profiles(profiles, now=None):
+    """Serving path: Bright Data profile dicts -> (N, 23) float32 feature matrix"""
+    return transform_columns(profile_columns(profiles, now=now))
+
+
+def transform_mgtab(raw_features):
+    """
+    Training path: MGTAB feature columns -> (N, 23) feature tensor.
+    MGTAB columns arrive already min-max scaled to [0, 1], so base features
+    pass through and only the derived features are computed.
+
+    The derived ratios are taken over those scaled columns, while serving
+    takes them over raw Bright Data counts. MGTAB does not publish the
+    per-column min/max, so the scaled columns cannot be mapped back to
+    counts: Follower Ratio, Following Ratio and Ratio Score share a formula
+    between training and serving but NOT a scale, and their values are not
+    comparable across the two paths.
+    """
+    raw = raw_features.double().numpy()
+    out = []
+    for feature in FEATURES:
+        if feature.inputs:
+            out.append(feature.transform(*(raw[:, MGTAB_COLUMNS[name]] for name in feature.inputs)))
+        else:
+            out.append(raw[:, feature.mgtab_column])
+    return torch.from_numpy(np.stack(out, axis=1).astype(np.float32))
@@ -0,0 +1,146 @@
+# src/graph_features.py
+import torch
+from pathlib import Path
+
+# MGTAB relation ids in edge_type.pt
+RELATIONS = ["followers", "friends", "mention", "reply", "quoted", "url", "hashtag"]
+DEFAULT_RELATIONS = ["followers", "friends", "mention"]
+
+
+def load_mgtab_edges():
+    """Load MGTAB edge list (2, E) and per-edge relation ids (E,)"""
+    print("Loading MGTAB edges...")
+    data_dir = Path("data")
+    edge_index = torch.load(data_dir / "edge_index.pt").long()
+    edge_type = torch.load(data_dir / "edge_type.pt").long()
+    print(f"✓ Loaded {edge_index.shape[1]:,} edges")
+    return edge_index, edge_type
+
+
+class GraphFeatureStore:
+    """
+    Neighborhood aggregates per node and relation, kept as running sums:
+    out/in degree, labeled and bot neighbor counts, and the sum of neighbor
+    features. The initial build uses sparse matmuls over the adjacency;
+    add_edges() updates the same sums for new edges with scatter-adds, so
+    no dense N x N matrix is ever formed.
+
+    These are offline features over MGTAB only. The served model does not
+    consume them: live Bright Data accounts have no MGTAB node id to look up.
+    """
+
+    def __init__(self, node_features, labels, label_mask, relations=DEFAULT_RELATIONS):
+        self.node_features = node_features.float()
+        self.bot = (labels == 1).float() * label_mask.float()
+        self.labeled = label_mask.float()
+        self.relations = list(relations)
+
+        num_nodes, num_features = self.node_features.shape
+        self.out_degree = torch.zeros(len(self.relations), num_nodes)
+        self.in_degree = torch.zeros(len(self.relations), num_nodes)
+        self.bot_neighbors = torch.zeros(len(self.relations), num_nodes)
+        self.labeled_neighbors = torch.zeros(len(self.relations), num_nodes)
+        self.neighbor_sum = torch.zeros(len(self.relations), num_nodes, num_features)
+
+    @property
+    def num_nodes(self):
+        return self.node_features.shape[0]
+
+    def _relation_edges(self, edge_index, edge_type):
+        for r, name in enumerate(self.relations):
+            mask = edge_type == RELATIONS.index(name)
+            yield r, edge_index[:, mask]
+
+    def build(self, edge_index, edge_type):
+        """Compute all aggregates from scratch with sparse adjacency matmuls"""
+        # Node values aggregated over neighbors: [bot, labeled, features...]
+        values = torch.cat([self.bot[:, None], self.labeled[:, None], self.node_features], dim=1)
+        ones = torch.ones(self.num_nodes, 1)
+
+        for r, edges in self._relation_edges(edge_index, edge_type):
+            adjacency = torch.sparse_coo_tensor(
+                edges, torch.ones(edges.shape[1]), (self.num_nodes, self.num_nodes)
+            ).coalesce()
+            aggregated = torch.sparse.mm(adjacency, values)
+
+            self.bot_neighbors[r] = aggregated[:, 0]
+            self.labeled_neighbors[r] = aggregated[:, 1]
+            self.neighbor_sum[r] = aggregated[:, 2:]
+            self.out_degree[r] = torch.sparse.mm(adjacency, ones).squeeze(1)
+            self.in_degree[r] = torch.sparse.mm(adjacency.t(), ones).squeeze(1)
+            print(f"  {self.relations[r]}: {edges.shape[1]:,} edges")
+        return self
+
+    def add_edges(self, edge_index, edge_type):
+        """Fold new edges into the aggregates without touching existing ones"""
+        for r, edges in self._relation_edges(edge_index, edge_type):
+            src, dst = edges
+            ones = torch.ones(src.shape[0])
+            self.out_degree[r].index_add_(0, src, ones)
+            self.in_degree[r].index_add_(0, dst, ones)
+            self.bot_neighbors[r].index_add_(0, src, self.bot[dst])
+            self.labeled_neighbors[r].index_add_(0, src, self.labeled[dst])
+            self.neighbor_sum[r].index_add_(0, src, self.node_features[dst])
+
+    def feature_names(self, feature_names=None):
+        num_features = self.node_features.shape[1]
+        feature_names = feature_names or [f"F{i + 1}" for i in range(num_features)]
+        names = []
+        for relation in self.relations:
+            names += [f"{relation} out degree", f"{relation} in degree", f"{relation} bot fraction"]
+            names += [f"{relation} mean neighbor {name}" for name in feature_names]
+        return names
+
+    def features(self, node_ids=None):
+        """
+        (N, R * (3 + F)) graph features, for all nodes or just node_ids.
+        Degrees are log-scaled; bot fraction only counts labeled neighbors.
+        """
+        index = slice(None) if node_ids is None else torch.as_tensor(node_ids, dtype=torch.long)
+        blocks = []
+        for r in range(len(self.relations)):
+            out_degree = self.out_degree[r][index]
+            bot_fraction = self.bot_neighbors[r][index] / self.labeled_neighbors[r][index].clamp(min=1)
+            mean_neighbor = self.neighbor_sum[r][index] / out_degree.clamp(min=1)[:, None]
+            blocks += [
+                torch.log1p(out_degree)[:, None],
+                torch.log1p(self.in_degree[r][index])[:, None],
+                bot_fraction[:, None],
+                mean_neighbor
+            ]
+        return torch.cat(blocks, dim=1)
+
+    def save(self, path="data/graph_features.pt"):
+        torch.save({
+            'relations': self.relations,
+            'node_features': self.node_features,
+            'bot': self.bot,
+            'labeled': self.labeled,
+            'out_degree': self.out_degree,
+            'in_degree': self.in_degree,
+            'bot_neighbors': self.bot_neighbors,
+            'labeled_neighbors': self.labeled_neighbors,
+            'neighbor_sum': self.neighbor_sum
+        }, path)
+        print(f"✓ Graph features cached to {path}")
+
+    @classmethod
+    def load(cls, path="data/graph_features.pt"):
+        state = torch.load(path)
+        store = cls.__new__(cls)
+        for key, value in state.items():
+            setattr(store, key, value)
+        return store
+
+
+def build_graph_features(node_features, labels, train_mask, relations=DEFAULT_RELATIONS,
+                         output_path="data/graph_features.pt"):
+    """
+    Build and cache graph aggregates for MGTAB.
+    Only labels under train_mask feed the bot fraction, so test labels do not leak.
+    """
+    print("\nBuilding graph features...")
+    edge_index, edge_type = load_mgtab_edges()
+    store = GraphFeatureStore(node_features, labels, train_mask, relations).build(edge_index, edge_type)
+    store.save(output_path)
+    return store
@@ -1,75 +1,148 @@
 import torch
-import requests
 import os
-import numpy as np
-import shap
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from src.model import create_model
+from src.calibration import Calibrator
+from src.cascade import Prefilter
+from src.diagnostics import logger, sampled
+from src.drift import DriftMonitor
+from src.ensemble import Ensemble
+from src.features import FEATURE_NAMES, NUM_FEATURES, transform_profiles
+from src.postprocess import RADAR_INDICES, class_attributions, top_features as select_top_features, radar_payloads
+from src.profiling import span, torch_span
 
-FEATURE_NAMES = [
-    "Followers", "Following", "Posts Count", "Is Verified", "Account Age",
-    "Subscriptions", "Description Length", "Screen Name Length",
-    "Has URL", "Geo Enabled", "F11", "F12", "F13", "F14", "F15",
-    "F16", "F17", "F18", "F19", "F20",
-    "Follower Ratio", "Following Ratio", "Ratio Score"
-]
-
-
-
-load_dotenv()
-
-
-def safe_log(x):
-    return np.log10(x + 1) if x > 0 else 0.0
+# Fallback class profiles used when no baseline artifact is available
+DEFAULT_AVG_BOT = [-0.5, 1.2, 0.8, -1.0, -1.2, 1.5]
+DEFAULT_AVG_HUMAN = [0.8, -0.2, -0.1, 0.5, 0.8, -0.5]
 
 
 class BotDetector:
     """Real-time bot detection using Bright Data API"""
 
 
-    def __init__(self, model_path="models/bot_detector_mlp.pt"):
+    def __init__(self, model_path="models/bot_detector_mlp.pt", baseline_path="models/explainer_baseline.pt",
+                 drift_reference_path="data/drift_reference.pt", calibration_path="models/calibration.pt",
+                 prefilter_path="models/prefilter.pt", use_cascade=False, ensemble_path=None):
+        from dotenv import load_dotenv
+        load_dotenv()
+
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
 
-        print("Loading trained model...")
-        self.model = create_model(input_dim=23).to(self.device)
-        self.model.load_state_dict(torch.load(model_path, map_location=self.device, weights_only=True))
-        self.model.eval()
-        print(f"✓ Model loaded from {model_path}")
+        # Optional ensemble: members stacked into one fused forward (see src/ensemble.py)
+        self.ensemble = None
+        if ensemble_path is not None:
+            if Path(ensemble_path).exists():
+                self.ensemble = Ensemble.load(ensemble_path).to(self.device)
+                logger.info(f"✓ Ensemble of {self.ensemble.num_members} members loaded from {ensemble_path}")
+            else:
+                logger.warning(f"⚠ Ensemble requested but not found at {ensemble_path}, serving the single model")
 
+        if self.ensemble is not None:
+            # SHAP explains the mean member logits; members carry their own calibration
+            self.model = self.ensemble.model
+            self.calibrator = None
+        else:
+            logger.info("Loading trained model...")
+            self.model = create_model(input_dim=NUM_FEATURES).to(self.device)
+            self.model.load_state_dict(torch.load(model_path, map_location=self.device, weights_only=True))
+            self.model.eval()
+            logger.info(f"✓ Model loaded from {model_path}")
+
+            # Probability calibration fitted by train.py on a held-out split
+            if Path(calibration_path).exists():
+                self.calibrator = Calibrator.load(calibration_path)
+                logger.info(f"✓ Calibration loaded from {calibration_path} ({self.calibrator.method})")
+            else:
+                self.calibrator = Calibrator()
+                logger.warning(f"⚠ No calibration at {calibration_path}, probabilities are uncalibrated")
+                logger.info("  Run: python src/train.py --calibrate-only")
 
         scaler = torch.load('data/scaler.pt')
         self.feature_mean = scaler['feature_mean']
         self.feature_std = scaler['feature_std']
-        print("✓ Feature normalization parameters loaded.")
-
-        # Initialize SHAP explainer
-        background = torch.zeros(100, 23).to(self.device)
-        self.explainer = shap.DeepExplainer(self.model, background)
+        logger.info("✓ Feature normalization parameters loaded.")
+
+        # Explanation baselines (see src/baselines.py)
+        if Path(baseline_path).exists():
+            baselines = torch.load(baseline_path)
+            self.background = baselines['background']
+            profiles = baselines['class_profiles'][:, RADAR_INDICES]
+            self.avg_human = profiles[0].tolist()
+            self.avg_bot = profiles[1].tolist()
+            logger.info(f"✓ Explanation baselines loaded from {baseline_path}")
+        else:
+            # Zero is the training mean after normalization; one row is enough
+            self.background = torch.zeros(1, NUM_FEATURES)
+            self.avg_human = DEFAULT_AVG_HUMAN
+            self.avg_bot = DEFAULT_AVG_BOT
+            logger.warning(f"⚠ No baselines at {baseline_path}, run: python -m src.baselines")
+
+        # SHAP explainer is built on first use; see the explainer property
+        self._explainer = None
+        self._explainer_lock = threading.Lock()
+
+        # Live feature drift against the training distribution (see src/drift.py)
+        if Path(drift_reference_path).exists():
+            self.drift_monitor = DriftMonitor.from_file(drift_reference_path, FEATURE_NAMES)
+            logger.info(f"✓ Drift reference loaded from {drift_reference_path}")
+        else:
+            self.drift_monitor = None
+            logger.warning(f"⚠ No drift reference at {drift_reference_path}, run: python -m src.drift")
+
+        # Optional cascade: a cheap first stage settles confident rows (see src/cascade.py)
+        self.prefilter = None
+        if use_cascade:
+            if Path(prefilter_path).exists():
+                self.prefilter = Prefilter.load(prefilter_path)
+                logger.info(f"✓ Cascade prefilter loaded from {prefilter_path}")
+            else:
+                logger.warning(f"⚠ Cascade requested but no prefilter at {prefilter_path}, run: python -m src.cascade")
 
         self.bright_data_api_token = os.getenv('BRIGHT_DATA_API_TOKEN', '')
         self.dataset_id = os.getenv('BRIGHT_DATA_DATASET_ID', '')
+        # Overridable so tests and benchmarks can point at a local fake server
+        self.bright_data_url = os.getenv('BRIGHT_DATA_API_URL', 'https://api.brightdata.com/datasets/v3/scrape')
 
 
         if not self.bright_data_api_token or not self.dataset_id:
-            print("⚠ Warning: BRIGHT_DATA credentials not found in .env file")
-            print("  Add: BRIGHT_DATA_API_TOKEN and BRIGHT_DATA_DATASET_ID")
+            logger.warning("⚠ Warning: BRIGHT_DATA credentials not found in .env file")
+            logger.info("  Add: BRIGHT_DATA_API_TOKEN and BRIGHT_DATA_DATASET_ID")
+
 
+    @property
+    def explainer(self):
+        """SHAP DeepExplainer, built lazily so shap is only imported when explanations are needed"""
+        if self._explainer is None:
+            with self._explainer_lock:
+                if self._explainer is None:
+                    import shap
+                    self._explainer = shap.DeepExplainer(self.model, self.background.to(self.device))
+        return self._explainer
 
-    def extract_features_from_brightdata(self, username):
-        """Extract Twitter user features using Bright Data Web Scraper API"""
-        print(f"\nExtracting features for user: @{username}")
+
+    def extract_features_from_brightdata(self, username, verbose=True):
+        """
+        Extract Twitter user features using Bright Data Web Scraper API.
+        Returns (features, profile_data, live); live is False when the scrape
+        failed and the dummy profile was substituted.
+        """
+        if verbose:
+            logger.info(f"\nExtracting features for user: @{username}")
 
 
         if not self.bright_data_api_token or not self.dataset_id:
-            print("⚠ Using dummy features (add credentials to .env for real data)")
-            return self._create_dummy_features()
+            if verbose:
+                logger.info("⚠ Using dummy features (add credentials to .env for real data)")
+            return self._fallback_features()
 
 
         try:
-            url = "https://api.brightdata.com/datasets/v3/scrape"
+            import requests
+
+            url = self.bright_data_url
             headers = {
                 "Authorization": f"Bearer {self.bright_data_api_token}",
                 "Content-Type": "application/json"
@@ -84,11 +157,13 @@ class BotDetector:
             payload = {
                 "input": [{"user_name": username}]
             }
-            print("📡 Calling Bright Data API...")
+            if verbose:
+                logger.info("📡 Calling Bright Data API...")
             response = requests.post(url, headers=headers, params=params, json=payload, timeout=90)
 
 
-            print(f"Status Code: {response.status_code}")
+            if verbose:
+                logger.info(f"Status Code: {response.status_code}")
 
 
             if response.status_code == 200:
@@ -101,217 +176,218 @@ class BotDetector:
                     elif 'data' in result:
                         profile_data = result['data']
                     elif 'snapshot_id' in result:
-                        print(f"⚠ Async response - snapshot_id: {result['snapshot_id']}")
-                        return self._create_dummy_features()
+                        logger.warning(f"⚠ Async response - snapshot_id: {result['snapshot_id']}")
+                        return self._fallback_features()
                     else:
-                        print(f"Unexpected response format")
-                        return self._create_dummy_features()
+                        logger.warning("Unexpected response format")
+                        return self._fallback_features()
                 else:
-                    print(f"Unexpected response type: {type(result)}")
-                    return self._create_dummy_features()
+                    logger.warning(f"Unexpected response type: {type(result)}")
+                    return self._fallback_features()
 
 
-                print(f"✓ Got live data for: @{profile_data.get('id', 'unknown')}")
                 features = self._map_brightdata_to_features(profile_data)
-                print("✓ Features extracted successfully from Bright Data!")
-                return features, profile_data
+                if verbose:
+                    logger.info(f"✓ Got live data for: @{profile_data.get('id', 'unknown')}")
+                    logger.info("✓ Features extracted successfully from Bright Data!")
+                return features, profile_data, True
 
 
             else:
-                print(f"✗ API error: {response.status_code}")
-                print(f"Response: {response.text[:500]}")
+                logger.error(f"✗ API error: {response.status_code}")
+                logger.error(f"Response: {response.text[:500]}")
                 if response.status_code == 401:
-                    print("\n💡 Authentication failed. Check your credentials in .env")
+                    logger.error("\n💡 Authentication failed. Check your credentials in .env")
                 elif response.status_code == 400:
-                    print("\n💡 Validation error. Check API parameters")
-                return self._create_dummy_features()
+                    logger.error("\n💡 Validation error. Check API parameters")
+                return self._fallback_features()
 
 
         except Exception as e:
-            print(f"✗ Error: {e}")
-            return self._create_dummy_features()
+            logger.error(f"✗ Error: {e}")
+            return self._fallback_features()
 
 
     def _map_brightdata_to_features(self, data):
-        """Map Bright Data response to 23-feature tensor using log-scaling for numeric features and scaled account age"""
-        followers_val = data.get('followers', 0) or 0
-        following_val = data.get('following', 0) or 0
-        posts_val = data.get('posts_count', 0) or 0
-        subscriptions_val = data.get('subscriptions', 0) or 0
-
-
-        followers = safe_log(followers_val)
-        following = safe_log(following_val)
-        posts_count = safe_log(posts_val)
-        is_verified = 1 if data.get('is_verified', False) else 0
-
-
-        # Account age: do NOT log-transform, but scale by 10000 to match training expectations
-        date_joined = data.get('date_joined', '')
-        if date_joined:
-            try:
-                join_date = datetime.fromisoformat(date_joined.replace('Z', '+00:00'))
-                account_age = (datetime.now(join_date.tzinfo) - join_date).days
-            except:
-                account_age = 365
-        else:
-            account_age = 365
-        account_age_scaled = account_age / 10000.0   # <---- scaling
-
-
-        subscriptions = safe_log(subscriptions_val)
-        biography = data.get('biography') or ''
-        profile_name = data.get('profile_name') or ''
-        location = data.get('location') or ''
-        external_link = data.get('external_link') or ''
-
-
-        description_length = safe_log(len(biography))
-        screen_name_length = safe_log(len(profile_name))
-        has_url = 1 if external_link else 0
-        geo_enabled = 1 if location else 0
-
-
-        features_raw = [
-            followers, following, posts_count, float(is_verified), float(account_age_scaled),
-            subscriptions, description_length, screen_name_length,
-            float(has_url), float(geo_enabled), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        ]
-
-
-        # Derived metrics: ratios, log-transformed
-        follower_ratio = safe_log(followers_val / (following_val + 1e-6))
-        following_ratio = safe_log(following_val / (followers_val + 1e-6))
-        ratio_score = min(abs(np.log10((followers_val / (following_val + 1e-6)) + 1e-6)), 3.0)
-
-
-        features_derived = [follower_ratio, following_ratio, ratio_score]
-        all_features = features_raw + features_derived
-        return torch.tensor(all_features, dtype=torch.float32)
+        """Map Bright Data response to the 23-feature tensor defined in src/features.py"""
+        return torch.from_numpy(transform_profiles([data])[0])
 
 
     def _create_dummy_features(self):
-        """Dummy features for local testing, using log-scaling and scaled account age"""
-        followers_val = 150
-        following_val = 2500
-        posts_val = 8000
-        subscriptions_val = 0
-        is_verified = 0.0
-        account_age = 45.0
-        account_age_scaled = account_age / 10000.0 # <---- scaling
-
-
-        description_length = safe_log(20)
-        screen_name_length = safe_log(8)
-        has_url = 1.0
-        geo_enabled = 0.0
-
-
-        followers = safe_log(followers_val)
-        following = safe_log(following_val)
-        posts_count = safe_log(posts_val)
-        subscriptions = safe_log(subscriptions_val)
-
-
-        features_raw = [
-            followers, following, posts_count, is_verified, account_age_scaled,
-            subscriptions, description_length, screen_name_length,
-            has_url, geo_enabled,
-            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        ]
-        follower_ratio = safe_log(followers_val / (following_val + 1e-6))
-        following_ratio = safe_log(following_val / (followers_val + 1e-6))
-        ratio_score = min(abs(np.log10(followers_val / (following_val + 1e-6) + 1e-6)), 3.0)
-
-
-        features_derived = [follower_ratio, following_ratio, ratio_score]
-        all_features = features_raw + features_derived
-        
+        """Dummy bot-like profile for local testing, run through the same feature pipeline"""
         dummy_profile = {
-            "followers": followers_val,
-            "following": following_val,
-            "posts_count": posts_val,
+            "followers": 150,
+            "following": 2500,
+            "posts_count": 8000,
             "is_verified": False,
-            "biography": "This is a dummy bio for local testing.",
-            "date_joined": "2023-01-01T00:00:00Z"
+            "biography": "Dummy bio for tests.",
+            "profile_name": "dummy_01",
+            "external_link": "https://example.com",
+            "date_joined": (datetime.now(timezone.utc) - timedelta(days=45)).isoformat()
         }
-        
-        return torch.tensor(all_features, dtype=torch.float32), dummy_profile
 
+        return self._map_brightdata_to_features(dummy_profile), dummy_profile
 
-    def predict(self, username):
-        """Predict if user is bot or human"""
-        features, profile_data = self.extract_features_from_brightdata(username)
-        print("\nExtracted features:", features.tolist())
 
-        # Normalize features with training mean/std
-        features = (features - self.feature_mean) / (self.feature_std + 1e-8)
-        features = features.unsqueeze(0).to(self.device)
-
-        print("\nDEBUG INFO")
-        print("Normalized input features:", features[0].tolist())
+    def _fallback_features(self):
+        """Dummy features standing in for a failed scrape, flagged as not live"""
+        features, profile_data = self._create_dummy_features()
+        return features, profile_data, False
 
-        with torch.no_grad():
-            logits = self.model(features)
-            tpr = 100.0  #Change from 3.0 to 10.0
-            probabilities = torch.softmax(logits / tpr, dim=1)
-            print(f"🔥 After softmax: {probabilities.tolist()}")
-            print(f"Argmax result: {torch.argmax(probabilities, dim=1).item()}")
-            print("="*50 + "\n")
 
-            prediction = torch.argmax(probabilities, dim=1).item()
-            confidence = probabilities[0][prediction].item()
-            human_prob = probabilities[0][0].item()
-            bot_prob = probabilities[0][1].item()
-
-        # Calculate SHAP values
+    def _explain(self, features, predictions):
+        """Top 5 SHAP contributions per row for its predicted class, placeholders excluded"""
         try:
+            # shap_values is (N, 23, 2); keep the predicted class of each row
             shap_values = self.explainer.shap_values(features)
-            # shap_values is (1, 23, 2)
-            # We want the importance for the predicted class
-            class_shap = shap_values[0, :, prediction]
-            
-            # Create a list of (feature_name, importance_value)
-            feature_importance = []
-            for i, name in enumerate(FEATURE_NAMES):
-                if not name.startswith("F1") and not name.startswith("F20"): # Filter out dummy features
-                    feature_importance.append({
-                        "feature": name,
-                        "importance": float(class_shap[i])
-                    })
-            
-            # Sort by absolute importance
-            feature_importance.sort(key=lambda x: abs(x["importance"]), reverse=True)
-            # Keep top 5
-            top_features = feature_importance[:5]
+            return select_top_features(class_attributions(shap_values, predictions), k=5)
         except Exception as e:
-            print(f"Error calculating SHAP values: {e}")
-            top_features = []
-
-        result = "🤖 BOT" if prediction == 1 else "👤 HUMAN"
-
-        print(f"\n{'='*50}")
-        print(f"PREDICTION: {result}")
-        print(f"Confidence: {confidence*100:.2f}%")
-        print(f"\nProbabilities:")
-        print(f"  Human: {human_prob*100:.2f}%")
-        print(f"  Bot:   {bot_prob*100:.2f}%")
-        print(f"\nTop Contributing Features:")
-        for f in top_features:
-            print(f"  {f['feature']}: {f['importance']:.4f}")
-        print(f"{'='*50}")
-
-        # Prepare radar chart data (normalized features)
-        user_features = features[0].tolist()
-        radar_data = {
-            "labels": ["Followers", "Following", "Posts Count", "Account Age", "Follower Ratio", "Following Ratio"],
-            "user": [user_features[0], user_features[1], user_features[2], user_features[4], user_features[20], user_features[21]],
-            # Mock average normalized profiles for comparison
-            "avg_bot": [-0.5, 1.2, 0.8, -1.0, -1.2, 1.5],
-            "avg_human": [0.8, -0.2, -0.1, 0.5, 0.8, -0.5]
-        }
+            logger.error(f"Error calculating SHAP values: {e}")
+            return [[] for _ in range(features.shape[0])]
 
-        return prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data
+
+    def _normalize(self, features, live):
+        """
+        (N, 23) raw features -> normalized features on the model device.
+        Only rows flagged in `live` feed the drift monitor; fallback rows
+        from failed scrapes say nothing about the live traffic.
+        """
+        # Normalize features with training mean/std
+        features = (features - self.feature_mean) / (self.feature_std + 1e-8)
+        if self.drift_monitor is not None:
+            self.drift_monitor.observe_batch(features[torch.as_tensor(live, dtype=torch.bool)].numpy())
+        return features.to(self.device)
+
+
+    def _score(self, features, trace=None):
+        """
+        Score (N, 23) normalized features.
+        Returns predictions (N,), calibrated [human, bot] probabilities (N, 2),
+        top features per row, ensemble disagreement per row (None outside
+        ensemble mode and for settled rows) and the mask of rows settled by the prefilter.
+        """
+        num_rows = features.shape[0]
+        probabilities = torch.empty(num_rows, 2)
+        settled = torch.zeros(num_rows, dtype=torch.bool)
+        uncertainty = [None] * num_rows
+
+        if self.prefilter is not None:
+            with span(trace, "prefilter"), torch.no_grad():
+                prefilter_prob = self.prefilter.bot_probability(features).cpu()
+                settled = self.prefilter.settle(prefilter_prob)
+                probabilities[:, 0] = 1.0 - prefilter_prob
+                probabilities[:, 1] = prefilter_prob
+
+        # Rows not settled by the prefilter go through the MLP and SHAP
+        escalated = torch.nonzero(~settled).squeeze(1)
+        if escalated.numel() > 0:
+            with torch_span(trace, "forward"), torch.no_grad():
+                if self.ensemble is not None:
+                    mean, disagreement = self.ensemble.probabilities(features[escalated])
+                    probabilities[escalated] = mean.cpu()
+                    for row, value in zip(escalated.tolist(), disagreement.tolist()):
+                        uncertainty[row] = value
+                else:
+                    logits = self.model(features[escalated])
+                    probabilities[escalated] = self.calibrator.probabilities(logits).cpu()
+
+        predictions = torch.argmax(probabilities, dim=1)
+        # Settled labels follow decide()'s rule on the same probability
+        predictions[settled] = (probabilities[settled, 1] >= 0.5).long()
+
+        top_features = [[] for _ in range(num_rows)]
+        if escalated.numel() > 0:
+            with torch_span(trace, "shap"):
+                explained = self._explain(features[escalated], predictions[escalated])
+            for row, features_of_row in zip(escalated.tolist(), explained):
+                top_features[row] = features_of_row
+
+        return predictions, probabilities, top_features, uncertainty, settled
+
+
+    def predict(self, username, trace=None):
+        """Predict if user is bot or human; stages are recorded on `trace` when given"""
+        verbose = sampled()
+        with span(trace, "scrape"):
+            features, profile_data, live = self.extract_features_from_brightdata(username, verbose=verbose)
+        if verbose:
+            logger.info(f"\nExtracted features: {features.tolist()}")
+
+        with span(trace, "normalize"):
+            features = self._normalize(features.unsqueeze(0), [live])
+
+        if verbose:
+            logger.info("\nDEBUG INFO")
+            logger.info(f"Normalized input features: {features[0].tolist()}")
+
+        predictions, probabilities, top_features, uncertainty, settled = self._score(features, trace)
+
+        with span(trace, "postprocess"):
+            prediction = predictions[0].item()
+            human_prob, bot_prob = probabilities[0].tolist()
+            confidence = bot_prob if prediction == 1 else human_prob
+            top_features = top_features[0]
+            uncertainty = uncertainty[0]
+            radar_data = radar_payloads(features, self.avg_bot, self.avg_human)[0]
+
+        if verbose:
+            if settled[0]:
+                logger.info("⚡ Settled by cascade prefilter")
+            result = "🤖 BOT" if prediction == 1 else "👤 HUMAN"
+            lines = [
+                f"\n{'='*50}",
+                f"PREDICTION: {result}",
+                f"Confidence: {confidence*100:.2f}%",
+                "\nProbabilities:",
+                f"  Human: {human_prob*100:.2f}%",
+                f"  Bot:   {bot_prob*100:.2f}%",
+                *([f"Ensemble disagreement: {uncertainty:.4f}"] if uncertainty is not None else []),
+                "\nTop Contributing Features:",
+                *[f"  {f['feature']}: {f['importance']:.4f}" for f in top_features],
+                f"{'='*50}"
+            ]
+            logger.info("\n".join(lines))
+
+        return prediction, confidence, (human_prob, bot_prob), top_features, profile_data, radar_data, uncertainty, live
+
+
+    def predict_batch(self, usernames, trace=None):
+        """
+        Score many usernames with one forward pass and one SHAP call.
+        Returns one entry per username: the same tuple as predict(), or the
+        exception raised while fetching that user's profile.
+        """
+        results = [None] * len(usernames)
+        rows, profiles, live = [], [], []
+        with span(trace, "scrape"):
+            for i, username in enumerate(usernames):
+                try:
+                    features, profile_data, is_live = self.extract_features_from_brightdata(username, verbose=False)
+                    rows.append((i, features))
+                    profiles.append(profile_data)
+                    live.append(is_live)
+                except Exception as e:
+                    results[i] = e
+        if not rows:
+            return results
+
+        with span(trace, "normalize"):
+            features = self._normalize(torch.stack([f for _, f in rows]), live)
+
+        predictions, probabilities, top_features, uncertainty, _ = self._score(features, trace)
+
+        with span(trace, "postprocess"):
+            radar_data = radar_payloads(features, self.avg_bot, self.avg_human)
+            confidences = probabilities.gather(1, predictions.unsqueeze(1)).squeeze(1).tolist()
+            for j, ((i, _), prediction, (human_prob, bot_prob)) in enumerate(
+                    zip(rows, predictions.tolist(), probabilities.tolist())):
+                results[i] = (prediction, confidences[j], (human_prob, bot_prob), top_features[j],
+                              profiles[j], radar_data[j], uncertainty[j], live[j])
+
+        if sampled():
+            bots = int(predictions.sum())
+            logger.info(f"Scored batch of {len(rows)}: {bots} bots, {len(rows) - bots} humans")
+        return results
 
 if __name__ == "__main__":
     print("="*50)
@@ -0,0 +1,159 @@
+# src/jobs.py
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.diagnostics import logger
+from src.serialization import slim_results
+
+# Job lifecycle: queued -> running -> completed | failed
+ACTIVE_STATUSES = ("queued", "running")
+
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class JobManager:
+    """
+    Background batch scoring with results persisted to local disk.
+
+    Each job lives in <root>/<job_id>/ with:
+      status.json    progress and metadata, rewritten atomically per chunk
+      input.json     the usernames and requested fields
+      results.jsonl  one result row per line, appended chunk by chunk
+    Jobs left queued or running by a previous process are resumed on start.
+    """
+
+    def __init__(self, score_fn, root="jobs", max_workers=1, chunk_size=100):
+        self.score_fn = score_fn
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._stopping = threading.Event()
+        self._status_lock = threading.Lock()
+        self._resume()
+
+    def _job_dir(self, job_id):
+        return self.root / job_id
+
+    def _write_status(self, job_id, **updates):
+        with self._status_lock:
+            path = self._job_dir(job_id) / "status.json"
+            status = json.loads(path.read_text()) if path.exists() else {"job_id": job_id}
+            status.update(updates, updated_at=time.time())
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(status))
+            os.replace(tmp, path)
+            return status
+
+    def submit(self, usernames, fields=None):
+        """Persist a new job and queue it; returns the job status"""
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True)
+        (job_dir / "input.json").write_text(json.dumps({
+            "usernames": usernames,
+            "fields": sorted(fields) if fields is not None else None
+        }))
+        status = self._write_status(
+            job_id, status="queued", total=len(usernames),
+            processed=0, errors=0, shared=None, error=None, created_at=time.time()
+        )
+        self.executor.submit(self._run, job_id)
+        return status
+
+    def status(self, job_id):
+        """Current status dict, or None for an unknown job id"""
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        path = self._job_dir(job_id) / "status.json"
+        if not path.exists():
+            return None
+        with self._status_lock:
+            return json.loads(path.read_text())
+
+    def results_path(self, job_id):
+        return self._job_dir(job_id) / "results.jsonl"
+
+    def read_results(self, job_id, rows, block_size=64 * 1024):
+        """
+        Byte length of the first `rows` result lines and a generator of exactly
+        those bytes. Rows counted in status.json are flushed before the status
+        is written, so this never includes a line the worker is still appending.
+        """
+        path = self.results_path(job_id)
+        length = self._rows_offset(path, rows)
+
+        def blocks():
+            with open(path, "rb") as f:
+                remaining = length
+                while remaining > 0:
+                    block = f.read(min(block_size, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    yield block
+
+        return length, blocks()
+
+    def _run(self, job_id):
+        job_dir = self._job_dir(job_id)
+        try:
+            job_input = json.loads((job_dir / "input.json").read_text())
+            usernames = job_input["usernames"]
+            fields = set(job_input["fields"]) if job_input["fields"] is not None else None
+            status = self._write_status(job_id, status="running")
+
+            # Resume after the rows already on disk
+            processed = status["processed"]
+            errors = status["errors"]
+            shared = status["shared"]
+            with open(job_dir / "results.jsonl", "a") as out:
+                out.truncate(self._rows_offset(job_dir / "results.jsonl", processed))
+                for start in range(processed, len(usernames), self.chunk_size):
+                    if self._stopping.is_set():
+                        return
+                    chunk = usernames[start:start + self.chunk_size]
+                    payload = slim_results(self.score_fn(chunk), fields)
+                    for row in payload["results"]:
+                        out.write(json.dumps(row) + "\n")
+                        errors += row["error"] is not None
+                    out.flush()
+
+                    processed = start + len(chunk)
+                    shared = shared or payload.get("shared")
+                    self._write_status(job_id, processed=processed, errors=errors, shared=shared)
+
+            self._write_status(job_id, status="completed")
+        except Exception as e:
+            logger.error("✗ Job %s failed: %s", job_id, e)
+            self._write_status(job_id, status="failed", error=str(e))
+
+    @staticmethod
+    def _rows_offset(path, rows):
+        """Byte offset just after the first `rows` lines, dropping any partial chunk"""
+        offset = 0
+        with open(path, "rb") as f:
+            for _ in range(rows):
+                line = f.readline()
+                if not line:
+                    break
+                offset += len(line)
+        return offset
+
+    def _resume(self):
+        for status_path in self.root.glob("*/status.json"):
+            status = json.loads(status_path.read_text())
+            if status.get("status") in ACTIVE_STATUSES:
+                logger.info("↻ Resuming job %s at %s/%s", status['job_id'], status['processed'], status['total'])
+                self.executor.submit(self._run, status["job_id"])
+
+    def shutdown(self):
+        """Stop after the current chunk; unfinished jobs resume on next start"""
+        self._stopping.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
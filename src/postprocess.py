@@ -0,0 +1,50 @@
+# src/postprocess.py
+import torch
+
+from src.features import FEATURE_NAMES, NUM_FEATURES, PLACEHOLDER_INDICES
+
+# Features shown on the radar chart, as indices into FEATURE_NAMES
+RADAR_INDICES = [0, 1, 2, 4, 20, 21]
+RADAR_LABELS = [FEATURE_NAMES[i] for i in RADAR_INDICES]
+
+# Placeholder features never appear in explanations
+EXPLAINABLE = torch.ones(NUM_FEATURES, dtype=torch.bool)
+EXPLAINABLE[PLACEHOLDER_INDICES] = False
+
+
+def class_attributions(shap_values, predictions):
+    """(N, 23, 2) SHAP values -> (N, 23) attributions for each row's predicted class"""
+    shap_values = torch.as_tensor(shap_values)
+    predictions = torch.as_tensor(predictions, dtype=torch.long)
+    index = predictions.view(-1, 1, 1).expand(-1, shap_values.shape[1], 1)
+    return shap_values.gather(2, index).squeeze(2)
+
+
+def top_features(attributions, k=5):
+    """
+    Top-k features by absolute attribution for every row of an (N, 23) matrix.
+    Returns one [{"feature", "importance"}, ...] list per row, largest first.
+    """
+    attributions = torch.as_tensor(attributions)
+    k = min(k, int(EXPLAINABLE.sum()))
+    magnitude = attributions.abs().masked_fill(~EXPLAINABLE, -1.0)
+    indices = magnitude.topk(k, dim=1).indices
+    importances = attributions.gather(1, indices)
+
+    names = [FEATURE_NAMES[i] for i in range(NUM_FEATURES)]
+    return [
+        [{"feature": names[i], "importance": v} for i, v in zip(row_indices, row_values)]
+        for row_indices, row_values in zip(indices.tolist(), importances.tolist())
+    ]
+
+
+def radar_payloads(features, avg_bot, avg_human):
+    """
+    Radar chart data for every row of an (N, 23) normalized feature matrix.
+    Labels and class profiles are shared objects across rows.
+    """
+    columns = features[:, RADAR_INDICES].tolist()
+    return [
+        {"labels": RADAR_LABELS, "user": user, "avg_bot": avg_bot, "avg_human": avg_human}
+        for user in columns
+    ]
@@ -0,0 +1,159 @@
+# src/profiling.py
+"""
+Opt-in per-request tracing for the serving path.
+
+A Trace collects stage spans (wall time plus the net change in allocated
+Python blocks) and, for torch stages, torch.profiler op events with tensor
+allocation counts. Traces export to Chrome trace JSON (chrome://tracing or
+ui.perfetto.dev). Requests are traced when they send X-Bot-Shield-Profile: 1
+or are picked by BOT_SHIELD_PROFILE_RATE (default 0). Untraced requests
+only pay for a None check per stage.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+PROFILE_HEADER = "x-bot-shield-profile"
+PROFILE_RATE = float(os.getenv('BOT_SHIELD_PROFILE_RATE', '0'))
+TRACES_KEPT = int(os.getenv('BOT_SHIELD_TRACES_KEPT', '100'))
+
+# torch.profiler can only run once per process at a time
+_torch_profiler_lock = threading.Lock()
+
+
+class Trace:
+    """Stage spans and torch op events of one request, in microseconds since its start"""
+
+    def __init__(self, name, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self._origin = time.perf_counter_ns()
+        self.events = []
+        self.stages = OrderedDict()
+        self.duration_us = None
+        self._lock = threading.Lock()
+
+    def _now_us(self):
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def _add(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, **args):
+        """Time a pipeline stage"""
+        start = self._now_us()
+        blocks = sys.getallocatedblocks()
+        try:
+            yield args
+        finally:
+            duration = self._now_us() - start
+            args["python_blocks_delta"] = sys.getallocatedblocks() - blocks
+            self.stages[name] = self.stages.get(name, 0.0) + duration / 1000
+            self._add({"name": name, "cat": "stage", "ph": "X", "ts": start, "dur": duration,
+                       "pid": 0, "tid": threading.get_ident(), "args": args})
+
+    @contextmanager
+    def torch_span(self, name):
+        """A stage span that also records torch.profiler ops and tensor allocations"""
+        import torch
+        from torch.profiler import profile, ProfilerActivity
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+
+        with self.span(name) as args:
+            if not _torch_profiler_lock.acquire(blocking=False):
+                # Another traced request holds the profiler; keep the stage timing only
+                args["torch_profiler"] = "busy"
+                yield
+                return
+            try:
+                offset = self._now_us()
+                with profile(activities=activities, profile_memory=True) as prof:
+                    yield
+                events = prof.events()
+            finally:
+                _torch_profiler_lock.release()
+            base = min((e.time_range.start for e in events), default=0)
+
+            allocations, allocated_bytes = 0, 0
+            for e in events:
+                if e.cpu_memory_usage > 0:
+                    allocations += 1
+                    allocated_bytes += e.cpu_memory_usage
+                self._add({"name": e.name, "cat": "torch", "ph": "X",
+                           "ts": offset + e.time_range.start - base, "dur": e.time_range.elapsed_us(),
+                           "pid": 0, "tid": e.thread, "args": {"cpu_memory_usage": e.cpu_memory_usage}})
+            args["torch_ops"] = len(events)
+            args["tensor_allocations"] = allocations
+            args["tensor_allocated_bytes"] = allocated_bytes
+
+    def finish(self):
+        self.duration_us = self._now_us()
+        return self
+
+    def summary(self):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": None if self.duration_us is None else self.duration_us / 1000,
+            "stages_ms": dict(self.stages)
+        }
+
+    def to_chrome(self):
+        """Chrome trace event format"""
+        return {
+            "traceEvents": [{"name": "process_name", "ph": "M", "pid": 0, "args": {"name": self.name}}] + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": self.summary()
+        }
+
+
+def span(trace, name, **args):
+    """trace.span(), or a no-op when the request is not traced"""
+    return nullcontext(args) if trace is None else trace.span(name, **args)
+
+
+def torch_span(trace, name):
+    return nullcontext() if trace is None else trace.torch_span(name)
+
+
+class TraceRecorder:
+    """Decides which requests to trace and keeps the most recent traces"""
+
+    def __init__(self, rate=PROFILE_RATE, keep=TRACES_KEPT):
+        self.rate = rate
+        self.keep = keep
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, name, requested=False):
+        """A new Trace when requested or sampled, else None"""
+        if requested or (self.rate > 0 and random.random() < self.rate):
+            return Trace(name)
+        return None
+
+    def finish(self, trace):
+        trace.finish()
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            while len(self._traces) > self.keep:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id):
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def summaries(self):
+        with self._lock:
+            return [t.summary() for t in reversed(self._traces.values())]
@@ -0,0 +1,83 @@
+# src/serialization.py
+import json
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Fields a batch result row can carry; username and error are always kept
+RESULT_FIELDS = [
+    "prediction", "decision", "confidence", "bot_probability", "human_probability",
+    "top_features", "profile_data", "radar_data", "uncertainty", "live"
+]
+
+RESPONSE_FORMATS = ["json", "msgpack"]
+
+
+def parse_fields(fields):
+    """
+    Parse a comma-separated field list (e.g. "prediction,bot_probability").
+    Returns None when every field is wanted.
+    """
+    if not fields:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(RESULT_FIELDS)}")
+    return set(selected)
+
+
+def slim_results(results, fields=None):
+    """
+    Apply field selection and move constants shared by every row
+    (radar labels and class profiles) into one top-level block.
+    """
+    shared = {}
+    slimmed = []
+    for row in results:
+        out = {"username": row["username"]}
+        for name in RESULT_FIELDS:
+            if fields is None or name in fields:
+                out[name] = row[name]
+        out["error"] = row["error"]
+
+        radar_data = out.get("radar_data")
+        if radar_data:
+            if "radar" not in shared:
+                shared["radar"] = {k: v for k, v in radar_data.items() if k != "user"}
+            out["radar_data"] = {"user": radar_data["user"]}
+        slimmed.append(out)
+
+    payload = {"results": slimmed}
+    if shared:
+        payload["shared"] = shared
+    return payload
+
+
+def check_format(fmt):
+    """Validate a response format before any scoring work is done"""
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown format: {fmt}. Choose from: {', '.join(RESPONSE_FORMATS)}")
+    if fmt == "msgpack" and msgpack is None:
+        raise ValueError("msgpack format requested but msgpack is not installed")
+
+
+def render(payload, fmt="json"):
+    """Encode a response payload with the fastest available serializer"""
+    check_format(fmt)
+    if fmt == "msgpack":
+        return Response(content=msgpack.packb(payload, use_bin_type=True), media_type="application/x-msgpack")
+
+    if orjson is not None:
+        content = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        content = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return Response(content=content, media_type="application/json")
@@ -0,0 +1,198 @@
+# src/shap_report.py
+import argparse
+import json
+import math
+import torch
+import numpy as np
+from pathlib import Path
+
+from src.inference import BotDetector, FEATURE_NAMES
+from src.sharded_data import ShardedDataset, read_manifest
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch style) for many columns at once.
+    Memory is fixed by num_buckets, whatever the number of values added.
+    Quantiles are accurate to about relative_accuracy.
+    """
+
+    def __init__(self, num_columns, relative_accuracy=0.01, num_buckets=2048):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.num_buckets = num_buckets
+        self.offset = num_buckets // 2
+        self.positive = np.zeros((num_columns, num_buckets), dtype=np.int64)
+        self.negative = np.zeros((num_columns, num_buckets), dtype=np.int64)
+        self.zeros = np.zeros(num_columns, dtype=np.int64)
+        self.count = 0
+
+    def _bucket(self, magnitude):
+        keys = np.ceil(np.log(magnitude) / self.log_gamma).astype(np.int64) + self.offset
+        return np.clip(keys, 0, self.num_buckets - 1)
+
+    def _add_to(self, store, values, mask):
+        rows, cols = np.nonzero(mask)
+        buckets = self._bucket(np.abs(values[rows, cols]))
+        flat = cols * self.num_buckets + buckets
+        store += np.bincount(flat, minlength=store.size).reshape(store.shape)
+
+    def update(self, values):
+        """Add an (N, num_columns) batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        self._add_to(self.positive, values, values > 0)
+        self._add_to(self.negative, values, values < 0)
+        self.zeros += (values == 0).sum(axis=0)
+        self.count += values.shape[0]
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** (bucket - self.offset) / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Approximate q-quantile for every column"""
+        result = np.zeros(self.positive.shape[0])
+        if self.count == 0:
+            return result
+        rank = q * (self.count - 1)
+        for col in range(self.positive.shape[0]):
+            # Negative buckets run from the largest magnitude down to the smallest
+            neg_cum = np.cumsum(self.negative[col][::-1])
+            if rank < neg_cum[-1]:
+                bucket = self.num_buckets - 1 - np.searchsorted(neg_cum, rank, side='right')
+                result[col] = -self._value(bucket)
+                continue
+            rank_after_neg = rank - neg_cum[-1]
+            if rank_after_neg < self.zeros[col]:
+                result[col] = 0.0
+                continue
+            pos_cum = np.cumsum(self.positive[col])
+            bucket = np.searchsorted(pos_cum, rank_after_neg - self.zeros[col], side='right')
+            result[col] = self._value(min(bucket, self.num_buckets - 1))
+        return result
+
+
+class AttributionStats:
+    """Running per-feature attribution statistics with constant memory"""
+
+    def __init__(self, num_features=23, num_classes=2):
+        self.count = 0
+        self.sum_abs = np.zeros(num_features)
+        self.sum = np.zeros(num_features)
+        self.class_count = np.zeros(num_classes, dtype=np.int64)
+        self.class_sum = np.zeros((num_classes, num_features))
+        self.sketch = QuantileSketch(num_features)
+
+    def update(self, attributions, predictions):
+        """Add an (N, num_features) attribution batch and its predicted classes"""
+        self.count += attributions.shape[0]
+        self.sum_abs += np.abs(attributions).sum(axis=0)
+        self.sum += attributions.sum(axis=0)
+        np.add.at(self.class_sum, predictions, attributions)
+        self.class_count += np.bincount(predictions, minlength=len(self.class_count))
+        self.sketch.update(attributions)
+
+    def report(self, feature_names=FEATURE_NAMES, quantiles=(0.05, 0.5, 0.95)):
+        """Summarize the running statistics as a JSON-serializable dict"""
+        count = max(self.count, 1)
+        mean_abs = self.sum_abs / count
+        mean = self.sum / count
+        class_mean = self.class_sum / np.maximum(self.class_count, 1)[:, None]
+        quantile_values = {q: self.sketch.quantile(q) for q in quantiles}
+
+        features = []
+        for i, name in enumerate(feature_names):
+            features.append({
+                "feature": name,
+                "mean_abs_attribution": float(mean_abs[i]),
+                "mean_attribution": float(mean[i]),
+                "mean_attribution_human": float(class_mean[0][i]),
+                "mean_attribution_bot": float(class_mean[1][i]),
+                "quantiles": {f"p{int(q * 100)}": float(v[i]) for q, v in quantile_values.items()}
+            })
+        features.sort(key=lambda f: f["mean_abs_attribution"], reverse=True)
+
+        return {
+            "num_accounts": int(self.count),
+            "num_human": int(self.class_count[0]),
+            "num_bot": int(self.class_count[1]),
+            "features": features
+        }
+
+
+def iter_batches(X, batch_size):
+    """Yield consecutive row slices without copying the whole tensor"""
+    for start in range(0, X.shape[0], batch_size):
+        yield X[start:start + batch_size]
+
+
+def aggregate_attributions(detector, batches):
+    """
+    Explain normalized feature batches one at a time and fold each into
+    running statistics, so no per-row SHAP array outlives its batch.
+    """
+    stats = AttributionStats()
+    for batch in batches:
+        batch = batch.to(detector.device)
+        with torch.no_grad():
+            predictions = torch.argmax(detector.model(batch), dim=1).cpu().numpy()
+
+        shap_values = detector.explainer.shap_values(batch)
+        # Attribution for the predicted class of each row: (N, 23)
+        attributions = shap_values[np.arange(len(predictions)), :, predictions]
+        stats.update(attributions, predictions)
+        print(f"  Processed {stats.count} accounts")
+    return stats
+
+
+def dataset_batches(batch_size, shard_dir=None):
+    """
+    Number of accounts and a generator of their raw feature batches.
+    From shards written by train.py --export-shards when shard_dir is set,
+    otherwise as slices of a memory-mapped processed_data.pt.
+    """
+    if shard_dir is not None:
+        splits = [p for p in (Path(shard_dir) / s for s in ("train", "val", "test")) if p.exists()]
+        num_rows = sum(read_manifest(p)["num_samples"] for p in splits)
+        batches = (X for p in splits for X, _ in ShardedDataset(p, batch_size, shuffle=False))
+    else:
+        data = torch.load(Path("data") / "processed_data.pt", mmap=True, weights_only=False)
+        num_rows = data['X_train'].shape[0] + data['X_test'].shape[0]
+        batches = (X for key in ('X_train', 'X_test') for X in iter_batches(data[key], batch_size))
+    return num_rows, batches
+
+
+def build_report(batch_size=512, output_path="reports/shap_report.json", shard_dir=None):
+    """Aggregate SHAP attributions over the processed dataset and export a report"""
+    print("="*50)
+    print("GLOBAL FEATURE IMPORTANCE REPORT")
+    print("="*50)
+
+    detector = BotDetector()
+    num_rows, batches = dataset_batches(batch_size, shard_dir)
+    # Normalize batch by batch, so memory stays flat however many accounts there are
+    normalized = ((X - detector.feature_mean) / (detector.feature_std + 1e-8) for X in batches)
+
+    print(f"\nExplaining {num_rows} accounts in batches of {batch_size}...")
+    stats = aggregate_attributions(detector, normalized)
+    report = stats.report()
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nTop features by mean |attribution|:")
+    for f in report["features"][:10]:
+        print(f"  {f['feature']}: {f['mean_abs_attribution']:.4f}")
+    print(f"\n✅ Report saved to {output_path}")
+    print("="*50)
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate SHAP attributions into a global report")
+    parser.add_argument("--shards", metavar="DIR", help="Stream accounts from shards in DIR instead of processed_data.pt")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--output", default="reports/shap_report.json")
+    args = parser.parse_args()
+    build_report(batch_size=args.batch_size, output_path=args.output, shard_dir=args.shards)
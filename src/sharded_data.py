@@ -0,0 +1,195 @@
+# src/sharded_data.py
+import json
+import queue
+import threading
+import torch
+from pathlib import Path
+from torch.utils.data import IterableDataset, DataLoader, get_worker_info
+
+
+def write_shards(X, y, output_dir, shard_size=100_000):
+    """Split (X, y) into shard_XXXXX.pt files plus a manifest.json"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    num_shards = 0
+    for start in range(0, X.shape[0], shard_size):
+        torch.save({
+            'X': X[start:start + shard_size].clone(),
+            'y': y[start:start + shard_size].clone()
+        }, output_dir / f"shard_{num_shards:05d}.pt")
+        num_shards += 1
+
+    manifest = {
+        "num_shards": num_shards,
+        "num_samples": int(X.shape[0]),
+        "num_features": int(X.shape[1])
+    }
+    (output_dir / "manifest.json").write_text(json.dumps(manifest))
+    print(f"✓ Wrote {num_shards} shards ({X.shape[0]} samples) to {output_dir}")
+    return manifest
+
+
+def read_manifest(shard_dir):
+    return json.loads((Path(shard_dir) / "manifest.json").read_text())
+
+
+def load_shard(path):
+    """Memory-map a shard so only the pages actually read are loaded"""
+    shard = torch.load(path, mmap=True, weights_only=True)
+    return shard['X'], shard['y']
+
+
+def load_all_shards(shard_dir):
+    """Concatenate a (small) sharded split, e.g. the calibration hold-out"""
+    shards = [load_shard(p) for p in sorted(Path(shard_dir).glob("shard_*.pt"))]
+    return torch.cat([s[0] for s in shards]), torch.cat([s[1] for s in shards])
+
+
+class ShardedDataset(IterableDataset):
+    """
+    Streams (X, y) batches from on-disk shards.
+
+    With shuffle=True the shard order is reshuffled every epoch and rows are
+    shuffled across a window of `shuffle_window` shards, so batches mix
+    samples from different shards while memory holds only that window.
+    Call set_epoch() before each epoch. Under a multi-worker DataLoader each
+    worker reads a disjoint subset of shards.
+    """
+
+    def __init__(self, shard_dir, batch_size, shuffle=True, shuffle_window=2, seed=42):
+        self.paths = sorted(Path(shard_dir).glob("shard_*.pt"))
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.shuffle_window = shuffle_window
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _shard_order(self):
+        generator = torch.Generator().manual_seed(self.seed + self.epoch)
+        order = torch.randperm(len(self.paths), generator=generator).tolist() if self.shuffle else list(range(len(self.paths)))
+
+        worker = get_worker_info()
+        if worker is not None:
+            order = order[worker.id::worker.num_workers]
+        return [self.paths[i] for i in order], generator
+
+    def __iter__(self):
+        paths, generator = self._shard_order()
+        window = self.shuffle_window if self.shuffle else 1
+
+        carry_X, carry_y = None, None
+        for start in range(0, len(paths), window):
+            shards = [load_shard(p) for p in paths[start:start + window]]
+            X = torch.cat([s[0] for s in shards])
+            y = torch.cat([s[1] for s in shards])
+            if self.shuffle:
+                perm = torch.randperm(X.shape[0], generator=generator)
+                X, y = X[perm], y[perm]
+
+            # Rows left over from the previous window start the next batch
+            if carry_X is not None:
+                X, y = torch.cat([carry_X, X]), torch.cat([carry_y, y])
+
+            full = (X.shape[0] // self.batch_size) * self.batch_size
+            for b in range(0, full, self.batch_size):
+                yield X[b:b + self.batch_size], y[b:b + self.batch_size]
+            carry_X, carry_y = X[full:], y[full:]
+
+        if carry_X is not None and carry_X.shape[0] > 0:
+            yield carry_X, carry_y
+
+
+def sharded_loader(shard_dir, batch_size, shuffle=True, num_workers=0, prefetch_factor=2):
+    """DataLoader over a ShardedDataset; batching is done by the dataset itself"""
+    dataset = ShardedDataset(shard_dir, batch_size, shuffle=shuffle)
+    kwargs = {"prefetch_factor": prefetch_factor} if num_workers > 0 else {}
+    return DataLoader(dataset, batch_size=None, num_workers=num_workers, **kwargs)
+
+
+def prefetch(iterable, depth=2):
+    """
+    Produce items from `iterable` on a background thread, `depth` items ahead,
+    so disk reads and collation overlap with the training step.
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        # Wait for room, but give up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def producer():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(done)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=producer, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Stopped early (break, exception, close): release a producer blocked on a full queue
+        stop.set()
+        while thread.is_alive():
+            try:
+                items.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+class StreamingEvaluator:
+    """Accumulates a binary confusion matrix on tensors, batch by batch"""
+
+    def __init__(self, num_classes=2):
+        self.num_classes = num_classes
+        self.confusion = torch.zeros(num_classes, num_classes, dtype=torch.long)
+
+    def update(self, preds, labels):
+        """Add a batch; rows of the confusion matrix are true labels"""
+        index = labels.to(torch.long).cpu() * self.num_classes + preds.to(torch.long).cpu()
+        self.confusion += torch.bincount(index, minlength=self.num_classes ** 2).view(self.num_classes, -1)
+
+    def metrics(self, positive=1):
+        """Accuracy, precision, recall and F1 for the positive (bot) class"""
+        cm = self.confusion.double()
+        tp = cm[positive, positive]
+        precision = (tp / cm[:, positive].sum()).nan_to_num().item()
+        recall = (tp / cm[positive, :].sum()).nan_to_num().item()
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+        accuracy = (cm.diag().sum() / cm.sum()).nan_to_num().item()
+        return accuracy, precision, recall, f1
+
+    def report(self, target_names=("Human", "Bot")):
+        """Per-class precision/recall/F1/support table, like sklearn's classification_report"""
+        cm = self.confusion.double()
+        lines = [f"{'':>12} {'precision':>10} {'recall':>10} {'f1-score':>10} {'support':>10}", ""]
+        for c, name in enumerate(target_names):
+            precision = (cm[c, c] / cm[:, c].sum()).nan_to_num().item()
+            recall = (cm[c, c] / cm[c, :].sum()).nan_to_num().item()
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+            lines.append(f"{name:>12} {precision:>10.2f} {recall:>10.2f} {f1:>10.2f} {int(cm[c].sum()):>10}")
+        accuracy = (cm.diag().sum() / cm.sum()).nan_to_num().item()
+        lines.append("")
+        lines.append(f"{'accuracy':>12} {'':>10} {'':>10} {accuracy:>10.2f} {int(cm.sum()):>10}")
+        return "\n".join(lines)
@@ -4,10 +4,14 @@ import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import TensorDataset, DataLoader
 from pathlib import Path
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
+import argparse
 import time
 
 from model import create_model
+from calibration import Calibrator, expected_calibration_error
+from sharded_data import (
+    write_shards, read_manifest, load_all_shards, sharded_loader, prefetch, StreamingEvaluator
+)
 
 def load_processed_data():
     """Load preprocessed data"""
@@ -27,12 +31,53 @@ def load_processed_data():
     
     return X_train, y_train, X_test, y_test, num_features
 
+def split_validation(X_train, y_train, val_fraction=0.1, random_seed=42):
+    """Hold out part of the training set for calibration"""
+    generator = torch.Generator().manual_seed(random_seed)
+    indices = torch.randperm(X_train.shape[0], generator=generator)
+    num_val = int(X_train.shape[0] * val_fraction)
+
+    val_indices = indices[:num_val]
+    fit_indices = indices[num_val:]
+    print(f"✓ Held out {num_val} samples for calibration")
+    return X_train[fit_indices], y_train[fit_indices], X_train[val_indices], y_train[val_indices]
+
+def serving_logits(model, X, device):
+    """Logits for raw features normalized with data/scaler.pt, exactly as BotDetector does at serving time"""
+    scaler = torch.load(Path("data") / "scaler.pt")
+    X = (X - scaler['feature_mean']) / (scaler['feature_std'] + 1e-8)
+    model.eval()
+    with torch.no_grad():
+        return model(X.to(device)).cpu()
+
+def calibrate_model(model, X_val, y_val, device, method="temperature"):
+    """Fit probability calibration on rows the model was not trained on and save it next to the model"""
+    print(f"\nCalibrating probabilities ({method})...")
+    logits = serving_logits(model, X_val, device)
+
+    calibrator = Calibrator.fit(logits, y_val, method=method)
+    before = torch.softmax(logits, dim=1)
+    after = calibrator.probabilities(logits)
+
+    nll = nn.NLLLoss()
+    print(f"  Temperature: {calibrator.temperature:.4f}")
+    print(f"  NLL: {nll(torch.log(before + 1e-12), y_val):.4f} -> {nll(torch.log(after + 1e-12), y_val):.4f}")
+    print(f"  ECE: {expected_calibration_error(before[:, 1], y_val):.4f} -> "
+          f"{expected_calibration_error(after[:, 1], y_val):.4f}")
+
+    calibration_path = Path("models") / "calibration.pt"
+    calibrator.save(calibration_path)
+    print(f"  → Saved calibration to {calibration_path}")
+    return calibrator
+
 def train_epoch(model, train_loader, criterion, optimizer, device):
     """Train for one epoch"""
     model.train()
     total_loss = 0
+    num_batches = 0
     
-    for batch_X, batch_y in train_loader:
+    # Next batches are loaded on a background thread while this one trains
+    for batch_X, batch_y in prefetch(train_loader):
         batch_X, batch_y = batch_X.to(device), batch_y.to(device)
         
         # Forward pass
@@ -45,34 +90,44 @@ def train_epoch(model, train_loader, criterion, optimizer, device):
         optimizer.step()
         
         total_loss += loss.item()
+        num_batches += 1
     
-    return total_loss / len(train_loader)
+    return total_loss / max(num_batches, 1)
 
 def evaluate(model, test_loader, device):
-    """Evaluate model"""
+    """Evaluate model, accumulating a confusion matrix instead of per-row lists"""
     model.eval()
-    all_preds = []
-    all_labels = []
+    evaluator = StreamingEvaluator()
     
     with torch.no_grad():
-        for batch_X, batch_y in test_loader:
+        for batch_X, batch_y in prefetch(test_loader):
             batch_X = batch_X.to(device)
             outputs = model(batch_X)
             preds = torch.argmax(outputs, dim=1)
-            
-            all_preds.extend(preds.cpu().numpy())
-            all_labels.extend(batch_y.numpy())
+            evaluator.update(preds, batch_y)
     
     # Calculate metrics
-    accuracy = accuracy_score(all_labels, all_preds)
-    precision = precision_score(all_labels, all_preds, average='binary')
-    recall = recall_score(all_labels, all_preds, average='binary')
-    f1 = f1_score(all_labels, all_preds, average='binary')
+    accuracy, precision, recall, f1 = evaluator.metrics()
     
-    return accuracy, precision, recall, f1, all_labels, all_preds
+    return accuracy, precision, recall, f1, evaluator
 
-def train_model(epochs=50, batch_size=64, learning_rate=0.001):
-    """Main training function"""
+def export_shards(shard_dir="data/shards", shard_size=100_000):
+    """Write the train / calibration / test splits as shards for streaming training"""
+    X_train, y_train, X_test, y_test, _ = load_processed_data()
+    X_train, y_train, X_val, y_val = split_validation(X_train, y_train)
+
+    shard_dir = Path(shard_dir)
+    write_shards(X_train, y_train, shard_dir / "train", shard_size)
+    write_shards(X_val, y_val, shard_dir / "val", shard_size)
+    write_shards(X_test, y_test, shard_dir / "test", shard_size)
+
+def train_model(epochs=50, batch_size=64, learning_rate=0.001, calibration_method="temperature",
+                shard_dir=None, num_workers=0):
+    """
+    Main training function
+    With shard_dir set, batches stream from shards written by export_shards
+    instead of loading processed_data.pt into memory.
+    """
     print("="*60)
     print("TRAINING BOT DETECTION MODEL")
     print("="*60)
@@ -81,15 +136,26 @@ def train_model(epochs=50, batch_size=64, learning_rate=0.001):
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     print(f"Device: {device}\n")
     
-    # Load data
-    X_train, y_train, X_test, y_test, num_features = load_processed_data()
-    
-    # Create data loaders
-    train_dataset = TensorDataset(X_train, y_train)
-    test_dataset = TensorDataset(X_test, y_test)
-    
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    test_loader = DataLoader(test_dataset, batch_size=batch_size, shuffle=False)
+    if shard_dir is None:
+        # Load data
+        X_train, y_train, X_test, y_test, num_features = load_processed_data()
+        X_train, y_train, X_val, y_val = split_validation(X_train, y_train)
+        
+        # Create data loaders
+        train_dataset = TensorDataset(X_train, y_train)
+        test_dataset = TensorDataset(X_test, y_test)
+        
+        train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
+        test_loader = DataLoader(test_dataset, batch_size=batch_size, shuffle=False)
+    else:
+        shard_dir = Path(shard_dir)
+        manifest = read_manifest(shard_dir / "train")
+        num_features = manifest["num_features"]
+        print(f"Streaming {manifest['num_samples']} training samples from {manifest['num_shards']} shards")
+        
+        train_loader = sharded_loader(shard_dir / "train", batch_size, shuffle=True, num_workers=num_workers)
+        test_loader = sharded_loader(shard_dir / "test", batch_size, shuffle=False, num_workers=num_workers)
+        X_val, y_val = load_all_shards(shard_dir / "val")
     
     # Create model
     print(f"\nCreating model...")
@@ -108,12 +174,16 @@ def train_model(epochs=50, batch_size=64, learning_rate=0.001):
     start_time = time.time()
     
     for epoch in range(epochs):
+        # Reshuffle shard order each epoch when streaming
+        if hasattr(train_loader.dataset, "set_epoch"):
+            train_loader.dataset.set_epoch(epoch)
+        
         # Train
         train_loss = train_epoch(model, train_loader, criterion, optimizer, device)
         
         # Evaluate every 5 epochs
         if (epoch + 1) % 5 == 0:
-            accuracy, precision, recall, f1, _, _ = evaluate(model, test_loader, device)
+            accuracy, precision, recall, f1, _ = evaluate(model, test_loader, device)
             
             print(f"Epoch {epoch+1}/{epochs} | Loss: {train_loss:.4f} | "
                   f"Acc: {accuracy:.4f} | Prec: {precision:.4f} | "
@@ -134,7 +204,7 @@ def train_model(epochs=50, batch_size=64, learning_rate=0.001):
     print("="*60)
     
     model.load_state_dict(torch.load(Path("models") / "bot_detector_mlp.pt", weights_only=True))
-    accuracy, precision, recall, f1, y_true, y_pred = evaluate(model, test_loader, device)
+    accuracy, precision, recall, f1, evaluator = evaluate(model, test_loader, device)
     
     print(f"\nTest Set Performance:")
     print(f"  Accuracy:  {accuracy:.4f}")
@@ -143,11 +213,49 @@ def train_model(epochs=50, batch_size=64, learning_rate=0.001):
     print(f"  F1-Score:  {f1:.4f}")
     
     print(f"\nDetailed Classification Report:")
-    print(classification_report(y_true, y_pred, target_names=['Human', 'Bot']))
+    print(evaluator.report(target_names=['Human', 'Bot']))
+    
+    calibrate_model(model, X_val, y_val, device, method=calibration_method)
     
     print(f"\nTraining completed in {training_time:.2f} seconds")
     print(f"Model saved to: models/bot_detector_mlp.pt")
     print("="*60)
 
+def calibrate_saved_model(method="temperature"):
+    """
+    Fit calibration for the saved model without retraining.
+    The saved model may have seen all of X_train, so calibration is fitted on
+    half of X_test and its effect reported on the other half.
+    """
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    _, _, X_test, y_test, num_features = load_processed_data()
+    X_eval, y_eval, X_cal, y_cal = split_validation(X_test, y_test, val_fraction=0.5)
+
+    model = create_model(input_dim=num_features).to(device)
+    model.load_state_dict(torch.load(Path("models") / "bot_detector_mlp.pt", map_location=device, weights_only=True))
+    calibrator = calibrate_model(model, X_cal, y_cal, device, method=method)
+
+    logits = serving_logits(model, X_eval, device)
+    before = torch.softmax(logits, dim=1)[:, 1]
+    after = calibrator.probabilities(logits)[:, 1]
+    print(f"  Evaluation half ({X_eval.shape[0]} samples) ECE: "
+          f"{expected_calibration_error(before, y_eval):.4f} -> {expected_calibration_error(after, y_eval):.4f}")
+    return calibrator
+
 if __name__ == "__main__":
-    train_model(epochs=100, batch_size=32, learning_rate=0.0005)
+    parser = argparse.ArgumentParser(description="Train the bot detection MLP")
+    parser.add_argument("--calibrate-only", action="store_true", help="Fit calibration for the saved model")
+    parser.add_argument("--export-shards", metavar="DIR", help="Write train/val/test shards to DIR and exit")
+    parser.add_argument("--shards", metavar="DIR", help="Train by streaming shards from DIR")
+    parser.add_argument("--num-workers", type=int, default=0, help="DataLoader worker processes for shards")
+    parser.add_argument("--method", choices=["temperature", "isotonic"], default="temperature",
+                        help="Probability calibration method")
+    args = parser.parse_args()
+
+    if args.calibrate_only:
+        calibrate_saved_model(method=args.method)
+    elif args.export_shards:
+        export_shards(args.export_shards)
+    else:
+        train_model(epochs=100, batch_size=32, learning_rate=0.0005, calibration_method=args.method,
+                    shard_dir=args.shards, num_workers=args.num_workers)
@@ -0,0 +1,171 @@
+# src/verdict_store.py
+import hashlib
+import threading
+import time
+import numpy as np
+
+# Bytes per stored verdict: uint64 key + float32 bot probability + int8 prediction + uint32 timestamp
+BYTES_PER_VERDICT = 8 + 4 + 1 + 4
+
+
+def hash_username(username):
+    """64-bit key of a username; handles are case-insensitive and may carry a leading @"""
+    normalized = username.strip().lstrip("@").lower().encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(normalized, digest_size=8).digest(), "little")
+
+
+def hash_usernames(usernames):
+    return np.fromiter((hash_username(u) for u in usernames), dtype=np.uint64, count=len(usernames))
+
+
+class _Segment:
+    """Sealed, key-sorted column arrays; one verdict per key"""
+
+    def __init__(self, keys, bot_prob, prediction, scored_at):
+        self.keys = keys
+        self.bot_prob = bot_prob
+        self.prediction = prediction
+        self.scored_at = scored_at
+
+    def __len__(self):
+        return self.keys.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.bot_prob.nbytes + self.prediction.nbytes + self.scored_at.nbytes
+
+    def find(self, keys):
+        """Positions of `keys` in this segment and a mask of which were present"""
+        positions = np.searchsorted(self.keys, keys)
+        positions = np.minimum(positions, len(self) - 1)
+        return positions, self.keys[positions] == keys
+
+
+class VerdictStore:
+    """
+    Compact index of recent verdicts keyed by hashed username.
+
+    New verdicts go into a fixed-size append buffer. When it fills up it is
+    sorted, deduplicated (latest verdict wins) and sealed into an immutable
+    segment. Lookups search the buffer and then the segments newest-first
+    with vectorized searchsorted, so thousands of handles resolve in a few
+    array passes. Once more than `capacity` verdicts are held, whole oldest
+    segments are dropped. Each verdict costs BYTES_PER_VERDICT bytes.
+    """
+
+    def __init__(self, capacity=2_000_000, segment_size=65_536):
+        self.capacity = capacity
+        self.segment_size = segment_size
+        self.segments = []
+        self._keys = np.zeros(segment_size, dtype=np.uint64)
+        self._bot_prob = np.zeros(segment_size, dtype=np.float32)
+        self._prediction = np.zeros(segment_size, dtype=np.int8)
+        self._scored_at = np.zeros(segment_size, dtype=np.uint32)
+        self._size = 0
+        self._buffer_view = None
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size + sum(len(s) for s in self.segments)
+
+    def record(self, usernames, bot_probs, predictions, scored_at=None):
+        """Store verdicts for a batch of usernames"""
+        keys = hash_usernames(usernames)
+        bot_probs = np.asarray(bot_probs, dtype=np.float32)
+        predictions = np.asarray(predictions, dtype=np.int8)
+        now = np.uint32(time.time() if scored_at is None else scored_at)
+
+        with self._lock:
+            start = 0
+            while start < keys.shape[0]:
+                n = min(self.segment_size - self._size, keys.shape[0] - start)
+                end = self._size + n
+                self._keys[self._size:end] = keys[start:start + n]
+                self._bot_prob[self._size:end] = bot_probs[start:start + n]
+                self._prediction[self._size:end] = predictions[start:start + n]
+                self._scored_at[self._size:end] = now
+                self._size = end
+                self._buffer_view = None
+                start += n
+                if self._size == self.segment_size:
+                    self._seal()
+
+    def _seal(self):
+        """Turn the buffer into a sorted segment, then evict down to capacity"""
+        segment = self._buffer_segment()
+        if len(segment):
+            self.segments.append(segment)
+        self._size = 0
+
+        total = sum(len(s) for s in self.segments)
+        while len(self.segments) > 1 and total > self.capacity:
+            oldest = self.segments.pop(0)
+            total -= len(oldest)
+            self.evicted += len(oldest)
+
+    def _buffer_segment(self):
+        """Sorted copy of the buffer holding only the latest verdict per key"""
+        keys = self._keys[:self._size]
+        # Stable sort keeps insertion order among equal keys; keep the last of each run
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        last = np.ones(sorted_keys.shape[0], dtype=bool)
+        last[:-1] = sorted_keys[1:] != sorted_keys[:-1]
+        order = order[last]
+        return _Segment(keys[order].copy(), self._bot_prob[order].copy(),
+                        self._prediction[order].copy(), self._scored_at[order].copy())
+
+    def lookup(self, usernames, max_age=None):
+        """
+        Bulk lookup. Returns (found, bot_prob, prediction, scored_at) arrays
+        aligned with `usernames`; verdicts older than max_age seconds count as missing.
+        """
+        keys = hash_usernames(usernames)
+        found = np.zeros(keys.shape[0], dtype=bool)
+        bot_prob = np.full(keys.shape[0], np.nan, dtype=np.float32)
+        prediction = np.full(keys.shape[0], -1, dtype=np.int8)
+        scored_at = np.zeros(keys.shape[0], dtype=np.uint32)
+
+        with self._lock:
+            # The sorted view of the buffer is reused until the next record()
+            if self._size and self._buffer_view is None:
+                self._buffer_view = self._buffer_segment()
+            sources = [self._buffer_view] + self.segments[::-1] if self._size else self.segments[::-1]
+            for segment in sources:
+                pending = np.flatnonzero(~found)
+                if pending.shape[0] == 0:
+                    break
+                if not len(segment):
+                    continue
+                positions, hit = segment.find(keys[pending])
+                rows, positions = pending[hit], positions[hit]
+                found[rows] = True
+                bot_prob[rows] = segment.bot_prob[positions]
+                prediction[rows] = segment.prediction[positions]
+                scored_at[rows] = segment.scored_at[positions]
+
+            if max_age is not None:
+                found &= scored_at >= time.time() - max_age
+            hits = int(found.sum())
+            self.hits += hits
+            self.misses += keys.shape[0] - hits
+
+        return found, bot_prob, prediction, scored_at
+
+    def metrics(self):
+        with self._lock:
+            stored = self._size + sum(len(s) for s in self.segments)
+            return {
+                "verdicts": stored,
+                "capacity": self.capacity,
+                "segments": len(self.segments),
+                "buffered": self._size,
+                "bytes": int(self._keys.nbytes + self._bot_prob.nbytes + self._prediction.nbytes
+                             + self._scored_at.nbytes + sum(s.nbytes for s in self.segments)),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted
+            }
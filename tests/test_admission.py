@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from src.admission import AdmissionController, AdmissionRejected, TrafficClass, _Ticket
+
+
+def controller(slots=1, **bulk):
+    settings = {"weight": 1, "max_running": slots, "queue_budget": None, "client_limit": 8, **bulk}
+    return AdmissionController(slots, [
+        TrafficClass("interactive", weight=3, max_running=slots, queue_budget=None, client_limit=8),
+        TrafficClass("bulk", **settings),
+    ])
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_weighted_round_robin_share():
+    admission = controller()
+    for name in ("interactive", "bulk"):
+        admission.classes[name].queue.extend(_Ticket("c") for _ in range(20))
+
+    granted = []
+    for _ in range(16):
+        with admission._cond:
+            admission._dispatch()
+        chosen = next(c for c in admission.classes.values() if c.running)
+        granted.append(chosen.name)
+        # Finish the request so the next dispatch hands out the freed slot
+        chosen.running -= 1
+        admission.in_use -= 1
+
+    assert granted.count("interactive") == 12 and granted.count("bulk") == 4
+    # Smooth: bulk is spread out, never starved for more than three grants
+    assert all("bulk" in granted[i:i + 4] for i in range(0, 16, 4))
+
+
+def test_per_client_cap():
+    admission = controller(slots=2, client_limit=1)
+    with admission.admit("bulk", "a"):
+        with pytest.raises(AdmissionRejected):
+            with admission.admit("bulk", "a"):
+                pass
+        with admission.admit("bulk", "b"):
+            pass
+    assert admission.classes["bulk"].rejected == {"client_limit": 1}
+    with admission.admit("bulk", "a"):
+        pass
+
+
+def test_queue_budget_rejects_after_waiting():
+    admission = controller(queue_budget=0.05)
+    with admission.admit("interactive", "a"):
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected) as rejected:
+            with admission.admit("bulk", "b"):
+                pass
+        assert time.monotonic() - start >= 0.05
+    assert rejected.value.retry_after == 1
+    assert admission.classes["bulk"].rejected == {"queue_timeout": 1}
+    assert not admission.classes["bulk"].queue and not admission._per_client
+
+
+def test_queue_cap_rejects_at_once():
+    admission = controller(max_queued=1)
+    admitted = threading.Event()
+
+    def waiter():
+        with admission.admit("bulk", "waiter"):
+            admitted.set()
+
+    with admission.admit("interactive", "a"):
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        wait_until(lambda: len(admission.classes["bulk"].queue) == 1)
+
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            with admission.admit("bulk", "other"):
+                pass
+        assert time.monotonic() - start < 0.5
+        assert admission.classes["bulk"].rejected == {"queue_full": 1}
+
+    thread.join(timeout=5)
+    assert admitted.is_set()
+
+
+def test_slot_released_when_block_raises():
+    admission = controller()
+    with pytest.raises(ValueError):
+        with admission.admit("bulk", "a"):
+            raise ValueError("scoring failed")
+    assert admission.in_use == 0 and admission.classes["bulk"].running == 0
+    assert not admission._per_client
+    with admission.admit("interactive", "a"):
+        assert admission.in_use == 1
+
+
+def test_rejection_maps_to_429(monkeypatch):
+    from fastapi.testclient import TestClient
+    import src.app
+
+    # No bulk slot can ever be granted, so the request waits out its budget
+    monkeypatch.setattr(src.app, "admission", AdmissionController(1, [
+        TrafficClass("bulk", weight=1, max_running=0, queue_budget=0.01, client_limit=2),
+    ]))
+    response = TestClient(src.app.app).post("/predict/batch", json={"usernames": ["someone"]})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+import torch
+
+from src.calibration import Calibrator, decide, expected_calibration_error
+
+
+def synthetic_logits(temperature, num_rows=4000, seed=0):
+    """Logits whose labels are drawn from softmax(logits / temperature)"""
+    generator = torch.Generator().manual_seed(seed)
+    logits = torch.randn(num_rows, 2, generator=generator) * 10
+    probs = torch.softmax(logits / temperature, dim=1)[:, 1]
+    labels = torch.bernoulli(probs, generator=generator).long()
+    return logits, labels
+
+
+def test_decide_threshold():
+    decisions = decide([0.1, 0.5, 0.49, 0.9], threshold=0.5)
+    assert decisions.tolist() == ["HUMAN", "BOT", "HUMAN", "BOT"]
+
+
+def test_decide_abstain_band_is_open():
+    decisions = decide([0.2, 0.3, 0.5, 0.7, 0.8], threshold=0.5, abstain_band=(0.3, 0.7))
+    assert decisions.tolist() == ["HUMAN", "HUMAN", "ABSTAIN", "BOT", "BOT"]
+
+
+def test_fit_recovers_temperature():
+    logits, labels = synthetic_logits(temperature=4.0)
+    calibrator = Calibrator.fit(logits, labels)
+    assert calibrator.method == "temperature"
+    assert calibrator.temperature == pytest.approx(4.0, rel=0.15)
+
+
+def test_temperature_reduces_ece():
+    logits, labels = synthetic_logits(temperature=4.0)
+    calibrator = Calibrator.fit(logits, labels)
+    before = torch.softmax(logits, dim=1)[:, 1]
+    after = calibrator.probabilities(logits)[:, 1]
+    assert expected_calibration_error(after, labels) < expected_calibration_error(before, labels)
+
+
+def test_isotonic_is_monotone_and_normalized():
+    logits, labels = synthetic_logits(temperature=4.0)
+    calibrator = Calibrator.fit(logits, labels, method="isotonic")
+    assert calibrator.method == "isotonic"
+
+    grid = torch.stack([torch.zeros(201), torch.linspace(-50, 50, 201)], dim=1)
+    probs = calibrator.probabilities(grid)
+    assert torch.allclose(probs.sum(dim=1), torch.ones(201))
+    assert (probs >= 0).all() and (probs <= 1).all()
+    assert (np.diff(probs[:, 1].numpy()) >= -1e-6).all()
+
+
+def test_unknown_method():
+    logits, labels = synthetic_logits(temperature=1.0, num_rows=100)
+    with pytest.raises(ValueError):
+        Calibrator.fit(logits, labels, method="platt")
+
+
+def test_state_roundtrip(tmp_path):
+    logits, labels = synthetic_logits(temperature=2.0)
+    calibrator = Calibrator.fit(logits, labels, method="isotonic")
+    calibrator.save(tmp_path / "calibration.pt")
+    loaded = Calibrator.load(tmp_path / "calibration.pt")
+    assert loaded.method == "isotonic"
+    assert torch.equal(loaded.probabilities(logits), calibrator.probabilities(logits))
+
+
+def test_ece_of_perfect_and_worst_predictions():
+    labels = np.array([0, 1, 0, 1])
+    assert expected_calibration_error(labels.astype(float), labels) == 0.0
+    assert expected_calibration_error(1.0 - labels, labels) == pytest.approx(1.0)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import torch
+
+from src.calibration import decide, expected_calibration_error
+from src.cascade import PREFILTER_INDICES, Prefilter, tune_thresholds
+from src.features import NUM_FEATURES
+
+
+def test_thresholds_never_straddle_one_half():
+    # A prefilter that ranks perfectly but is never confident: nothing may be settled
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, 500)
+    prob = np.where(labels == 1, rng.uniform(0.51, 0.55, 500), rng.uniform(0.45, 0.49, 500))
+    low, high, settled = tune_thresholds(prob, labels, labels, max_f1_drop=0.05)
+    assert settled == 0.0
+    assert low < 0.5 <= high
+
+
+@pytest.mark.parametrize("min_confidence", [0.5, 0.8, 0.95])
+def test_thresholds_respect_min_confidence(min_confidence):
+    rng = np.random.default_rng(1)
+    prob = rng.uniform(0, 1, 1000)
+    labels = (rng.uniform(0, 1, 1000) < prob).astype(int)
+    low, high, _ = tune_thresholds(prob, labels, labels, max_f1_drop=1.0, min_confidence=min_confidence)
+    assert low <= 1 - min_confidence and low < 0.5
+    assert high >= min_confidence
+
+
+def test_min_confidence_below_one_half_rejected():
+    with pytest.raises(ValueError):
+        tune_thresholds(np.array([0.2, 0.8]), np.array([0, 1]), np.array([0, 1]), min_confidence=0.4)
+
+
+def test_calibrate_fixes_overconfident_prefilter():
+    generator = torch.Generator().manual_seed(2)
+    features = torch.randn(4000, NUM_FEATURES, generator=generator)
+    true_weight = torch.randn(len(PREFILTER_INDICES), generator=generator)
+    labels = (torch.rand(4000, generator=generator) < torch.sigmoid(features[:, PREFILTER_INDICES] @ true_weight - 1.0)).long()
+
+    # Right direction, but five times too sharp and shifted towards bots, like class_weight="balanced"
+    prefilter = Prefilter(true_weight * 5, 1.0, low=0.0, high=1.0)
+    fit, held_out = slice(0, 2000), slice(2000, None)
+    before = expected_calibration_error(prefilter.bot_probability(features[held_out]).numpy(), labels[held_out].numpy())
+    a, c = prefilter.calibrate(features[fit], labels[fit].numpy())
+    after = expected_calibration_error(prefilter.bot_probability(features[held_out]).numpy(), labels[held_out].numpy())
+
+    assert a == pytest.approx(0.2, abs=0.05)
+    assert after < before / 2 and after < 0.05
+    assert torch.allclose(prefilter.weight, true_weight, atol=0.15)
+
+
+def test_settled_predictions_agree_with_decide(tmp_path):
+    from src.inference import BotDetector
+
+    generator = torch.Generator().manual_seed(3)
+    path = tmp_path / "prefilter.pt"
+    Prefilter(torch.randn(len(PREFILTER_INDICES), generator=generator), 0.0, low=0.2, high=0.8).save(path)
+    detector = BotDetector(prefilter_path=str(path), use_cascade=True)
+
+    features = torch.randn(200, NUM_FEATURES, generator=generator)
+    predictions, probabilities, _, _, settled = detector._score(features)
+    assert settled.any() and (~settled).any()
+    assert torch.allclose(probabilities[settled, 1], detector.prefilter.bot_probability(features)[settled])
+
+    decisions = decide(probabilities[:, 1].numpy())
+    assert [str(d) for d in decisions] == ["BOT" if p == 1 else "HUMAN" for p in predictions.tolist()]
@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.drift import DriftMonitor
+
+NUM_FEATURES = 5
+NUM_BINS = 10
+
+
+def make_monitor(**kwargs):
+    edges = np.linspace(-3, 3, NUM_BINS - 1)
+    expected = np.full((NUM_FEATURES, NUM_BINS), 1.0 / NUM_BINS)
+    return DriftMonitor(edges, expected, [f"f{i}" for i in range(NUM_FEATURES)], half_life=50, **kwargs)
+
+
+def reference_observe(monitor, x):
+    """Row-at-a-time update as observe() computed it before batching"""
+    bins = np.searchsorted(monitor.edges, x)
+    monitor.counts *= monitor.decay
+    monitor.counts[np.arange(NUM_FEATURES), bins] += 1.0
+    monitor.weight = monitor.weight * monitor.decay + 1.0
+    alpha = 1.0 / monitor.weight
+    delta = x - monitor.mean
+    monitor.mean += alpha * delta
+    monitor.var = (1 - alpha) * (monitor.var + alpha * delta * delta)
+
+
+def test_batch_matches_row_at_a_time():
+    rng = np.random.default_rng(0)
+    first, second = rng.normal(size=(300, NUM_FEATURES)), rng.normal(1.0, 2.0, size=(200, NUM_FEATURES))
+
+    batched = make_monitor()
+    batched.observe_batch(first)
+    batched.observe_batch(second)
+
+    reference = make_monitor()
+    for row in np.concatenate([first, second]):
+        reference_observe(reference, row)
+
+    assert batched.observed == 500
+    np.testing.assert_allclose(batched.weight, reference.weight, rtol=1e-10)
+    np.testing.assert_allclose(batched.counts, reference.counts, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(batched.mean, reference.mean, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(batched.var, reference.var, rtol=1e-9)
+
+
+def test_single_observe_matches_batch():
+    rng = np.random.default_rng(1)
+    rows = rng.normal(size=(40, NUM_FEATURES))
+    single, batched = make_monitor(), make_monitor()
+    for row in rows:
+        single.observe(row)
+    batched.observe_batch(rows)
+    np.testing.assert_allclose(single.counts, batched.counts, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(single.var, batched.var, rtol=1e-9)
+
+
+def test_batch_crossing_check_interval_runs_check():
+    monitor = make_monitor(check_every=100, min_samples=10)
+    # Every row lands far outside the training histogram
+    monitor.observe_batch(np.full((150, NUM_FEATURES), 5.0))
+    assert monitor.alerts == [f"f{i}" for i in range(NUM_FEATURES)]
+
+
+def test_empty_batch_is_a_no_op():
+    monitor = make_monitor()
+    monitor.observe_batch(np.zeros((0, NUM_FEATURES)))
+    assert monitor.observed == 0 and monitor.weight == 0.0
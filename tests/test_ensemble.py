@@ -0,0 +1,111 @@
+import pytest
+import torch
+
+from src.calibration import Calibrator
+from src.ensemble import Ensemble, check_folding
+from src.features import FEATURE_NAMES, NUM_FEATURES
+from src.model import create_model
+
+
+def random_member(seed, feature_indices=None, temperature=None):
+    """A member with non-trivial BatchNorm statistics, as after training"""
+    torch.manual_seed(seed)
+    model = create_model(input_dim=NUM_FEATURES if feature_indices is None else len(feature_indices))
+    for module in model.network:
+        if isinstance(module, torch.nn.BatchNorm1d):
+            module.running_mean.uniform_(-1, 1)
+            module.running_var.uniform_(0.5, 2)
+            module.weight.data.uniform_(0.5, 1.5)
+            module.bias.data.uniform_(-0.5, 0.5)
+    return {
+        'state_dict': model.state_dict(),
+        'feature_indices': feature_indices,
+        'calibration': Calibrator(temperature).state_dict() if temperature else None
+    }
+
+
+def test_fused_forward_matches_members():
+    subset = [FEATURE_NAMES.index(n) for n in FEATURE_NAMES[:10]]
+    ensemble = Ensemble([random_member(0), random_member(1, subset), random_member(2)])
+    assert check_folding(ensemble) < 1e-4
+
+
+def test_single_member_matches_model():
+    member = random_member(3, temperature=1.7)
+    ensemble = Ensemble([member])
+    model = create_model(NUM_FEATURES)
+    model.load_state_dict(member['state_dict'])
+    model.eval()
+
+    x = torch.randn(64, NUM_FEATURES)
+    with torch.no_grad():
+        mean, disagreement = ensemble.probabilities(x)
+        expected = Calibrator(1.7).probabilities(model(x))
+    assert torch.allclose(mean, expected, atol=1e-5)
+    assert torch.all(disagreement == 0)
+
+
+def test_mean_and_disagreement():
+    ensemble = Ensemble([random_member(4), random_member(5, temperature=2.0)])
+    x = torch.randn(32, NUM_FEATURES)
+    with torch.no_grad():
+        logits = ensemble.model.member_logits(x)
+        mean, disagreement = ensemble.probabilities(x)
+    bots = torch.stack([torch.softmax(logits[0], dim=1)[:, 1], torch.softmax(logits[1] / 2.0, dim=1)[:, 1]])
+
+    assert mean.shape == (32, 2) and disagreement.shape == (32,)
+    assert torch.allclose(mean[:, 1], bots.mean(dim=0), atol=1e-6)
+    assert torch.allclose(mean.sum(dim=1), torch.ones(32), atol=1e-6)
+    assert torch.allclose(disagreement, (bots[0] - bots[1]).abs() / 2, atol=1e-6)
+
+
+def test_save_load_roundtrip(tmp_path):
+    ensemble = Ensemble([random_member(6), random_member(7, temperature=1.3)])
+    path = tmp_path / "ensemble.pt"
+    ensemble.save(path)
+    loaded = Ensemble.load(path)
+
+    x = torch.randn(16, NUM_FEATURES)
+    with torch.no_grad():
+        for a, b in zip(ensemble.probabilities(x), loaded.probabilities(x)):
+            assert torch.equal(a, b)
+
+
+def test_forward_is_mean_logits():
+    ensemble = Ensemble([random_member(8), random_member(9)])
+    x = torch.randn(8, NUM_FEATURES)
+    with torch.no_grad():
+        assert torch.allclose(ensemble.model(x), ensemble.model.member_logits(x).mean(dim=0))
+
+
+@pytest.mark.parametrize("num_members", [1, 2, 3])
+def test_shap_attributions_add_up(num_members):
+    import shap
+
+    ensemble = Ensemble([random_member(10 + i) for i in range(num_members)])
+    background = torch.randn(20, NUM_FEATURES)
+    x = torch.randn(6, NUM_FEATURES)
+    shap_values = shap.DeepExplainer(ensemble.model, background).shap_values(x, check_additivity=False)
+    with torch.no_grad():
+        expected = (ensemble.model(x) - ensemble.model(background).mean(dim=0)).numpy()
+    assert shap_values.shape == (6, NUM_FEATURES, 2)
+    assert abs(shap_values.sum(axis=1) - expected).max() < 1e-4
+
+
+def test_detector_explains_in_ensemble_mode(tmp_path):
+    from src.inference import BotDetector
+
+    path = tmp_path / "ensemble.pt"
+    Ensemble.from_checkpoints([("models/bot_detector_mlp.pt", "models/calibration.pt", None)] * 2).save(path)
+    single = BotDetector()
+    ensemble = BotDetector(ensemble_path=str(path))
+
+    features = torch.randn(4, NUM_FEATURES)
+    predictions, probabilities, top_features, uncertainty, _ = ensemble._score(features)
+    expected_predictions, expected_probabilities, expected_top, _, _ = single._score(features)
+    assert torch.equal(predictions, expected_predictions)
+    assert torch.allclose(probabilities, expected_probabilities, atol=1e-5)
+    assert uncertainty == pytest.approx([0.0] * 4, abs=1e-6)
+    for row, expected_row in zip(top_features, expected_top):
+        assert len(row) == 5
+        assert [f["feature"] for f in row] == [f["feature"] for f in expected_row]
@@ -0,0 +1,112 @@
+import math
+import numpy as np
+import pytest
+import torch
+from datetime import datetime, timezone
+
+from src.features import (
+    FEATURES, FEATURE_NAMES, NUM_FEATURES, PLACEHOLDER_INDICES,
+    transform_profiles, transform_mgtab
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+PROFILES = [
+    {},
+    {"followers": 0, "following": 0},
+    {"followers": None, "following": None, "date_joined": "garbage"},
+    {
+        "followers": 12345, "following": 67, "posts_count": 5, "subscriptions": 3,
+        "is_verified": True, "date_joined": "2015-06-01T00:00:00Z", "biography": "hello",
+        "profile_name": "x y", "location": "NYC", "external_link": "https://a.b"
+    },
+    {"followers": 150, "following": 2500, "posts_count": 8000, "date_joined": "2025-11-17T00:00:00"},
+]
+
+
+def safe_log(x):
+    return math.log10(x + 1) if x > 0 else 0.0
+
+
+def reference_features(data, now):
+    """Row-at-a-time features as the serving code computed them before the schema"""
+    followers = data.get('followers', 0) or 0
+    following = data.get('following', 0) or 0
+    date_joined = data.get('date_joined', '')
+    account_age = 365
+    if date_joined:
+        try:
+            join_date = datetime.fromisoformat(date_joined.replace('Z', '+00:00'))
+            current = now if join_date.tzinfo else now.replace(tzinfo=None)
+            account_age = (current - join_date).days
+        except ValueError:
+            pass
+    base = [
+        safe_log(followers), safe_log(following), safe_log(data.get('posts_count', 0) or 0),
+        1.0 if data.get('is_verified') else 0.0, account_age / 10000.0,
+        safe_log(data.get('subscriptions', 0) or 0), safe_log(len(data.get('biography') or '')),
+        safe_log(len(data.get('profile_name') or '')), 1.0 if data.get('external_link') else 0.0,
+        1.0 if data.get('location') else 0.0
+    ]
+    derived = [
+        safe_log(followers / (following + 1e-6)),
+        safe_log(following / (followers + 1e-6)),
+        min(abs(math.log10(followers / (following + 1e-6) + 1e-6)), 3.0)
+    ]
+    return np.array(base + [0.0] * 10 + derived, dtype=np.float32)
+
+
+def test_schema_shape():
+    assert NUM_FEATURES == 23
+    assert len(set(FEATURE_NAMES)) == NUM_FEATURES
+    assert PLACEHOLDER_INDICES == list(range(10, 20))
+    scaler = torch.load('data/scaler.pt')
+    assert scaler['feature_mean'].shape[0] == NUM_FEATURES
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_serving_matches_reference(profile):
+    features = transform_profiles([profile], now=NOW)[0]
+    np.testing.assert_array_equal(features, reference_features(profile, NOW))
+
+
+def test_batch_matches_single_rows():
+    batch = transform_profiles(PROFILES, now=NOW)
+    assert batch.shape == (len(PROFILES), NUM_FEATURES)
+    assert batch.dtype == np.float32
+    for row, profile in zip(batch, PROFILES):
+        np.testing.assert_array_equal(row, transform_profiles([profile], now=NOW)[0])
+
+
+def test_placeholders_are_zero_when_serving():
+    batch = transform_profiles(PROFILES, now=NOW)
+    assert not batch[:, PLACEHOLDER_INDICES].any()
+
+
+def test_training_ratio_inputs_are_not_on_serving_scale():
+    # MGTAB followers/following are min-max scaled to [0, 1]; serving feeds log counts,
+    # so derived ratios over them are not comparable (see transform_mgtab)
+    data = torch.load('data/processed_data.pt', weights_only=False)
+    counts = data['X_train'][:, [0, 1]]
+    assert counts.min() >= 0.0 and counts.max() <= 1.0
+
+    serving = transform_profiles([{"followers": 150, "following": 2500}], now=NOW)[0]
+    assert (serving[[0, 1]] > counts.max().item()).all()
+
+
+def test_training_derived_features_use_schema_transforms():
+    # Real training columns through transform_mgtab: derived features come from columns 0 and 1
+    data = torch.load('data/processed_data.pt', weights_only=False)
+    raw = data['X_train'][:512, :20]
+    training = transform_mgtab(raw).numpy()
+    followers, following = raw[:, 0].double().numpy(), raw[:, 1].double().numpy()
+    for i, feature in enumerate(FEATURES):
+        if feature.inputs:
+            np.testing.assert_allclose(training[:, i], feature.transform(followers, following).astype(np.float32))
+
+
+def test_training_passes_mgtab_columns_through():
+    raw = torch.rand(8, 20)
+    training = transform_mgtab(raw)
+    assert training.shape == (8, NUM_FEATURES)
+    assert torch.equal(training[:, :20], raw)
@@ -0,0 +1,81 @@
+import torch
+
+from src.graph_features import RELATIONS, GraphFeatureStore
+
+RELATIONS_USED = ["followers", "friends", "mention"]
+
+
+def synthetic_graph(num_nodes=60, num_edges=400, num_features=4, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    node_features = torch.randn(num_nodes, num_features, generator=generator)
+    labels = torch.randint(0, 2, (num_nodes,), generator=generator)
+    label_mask = torch.rand(num_nodes, generator=generator) < 0.7
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+    # Include relations the store ignores, so filtering is exercised
+    edge_type = torch.randint(0, len(RELATIONS), (num_edges,), generator=generator)
+    return node_features, labels, label_mask, edge_index, edge_type
+
+
+def dense_reference(node_features, labels, label_mask, edge_index, edge_type):
+    """Per-relation features from dense adjacency matrices (duplicate edges counted)"""
+    num_nodes = node_features.shape[0]
+    bot = ((labels == 1) & label_mask).float()
+    labeled = label_mask.float()
+    blocks = []
+    for name in RELATIONS_USED:
+        mask = edge_type == RELATIONS.index(name)
+        adjacency = torch.zeros(num_nodes, num_nodes)
+        adjacency.index_put_((edge_index[0, mask], edge_index[1, mask]), torch.ones(int(mask.sum())),
+                             accumulate=True)
+        out_degree = adjacency.sum(dim=1)
+        blocks += [
+            torch.log1p(out_degree)[:, None],
+            torch.log1p(adjacency.sum(dim=0))[:, None],
+            ((adjacency @ bot) / (adjacency @ labeled).clamp(min=1))[:, None],
+            (adjacency @ node_features) / out_degree.clamp(min=1)[:, None],
+        ]
+    return torch.cat(blocks, dim=1)
+
+
+def test_build_matches_dense_reference():
+    graph = synthetic_graph()
+    store = GraphFeatureStore(*graph[:3], relations=RELATIONS_USED).build(*graph[3:])
+    expected = dense_reference(*graph)
+    assert store.features().shape == expected.shape
+    assert torch.allclose(store.features(), expected, atol=1e-5)
+
+
+def test_incremental_edges_match_full_rebuild():
+    node_features, labels, label_mask, edge_index, edge_type = synthetic_graph(seed=1)
+    split = edge_index.shape[1] // 2
+
+    incremental = GraphFeatureStore(node_features, labels, label_mask, RELATIONS_USED)
+    incremental.build(edge_index[:, :split], edge_type[:split])
+    incremental.add_edges(edge_index[:, split:], edge_type[split:])
+
+    rebuilt = GraphFeatureStore(node_features, labels, label_mask, RELATIONS_USED).build(edge_index, edge_type)
+    assert torch.allclose(incremental.features(), rebuilt.features(), atol=1e-5)
+
+
+def test_unlabeled_neighbors_do_not_count():
+    # Node 0 points at a bot outside the label mask and at a labeled human
+    node_features = torch.zeros(3, 2)
+    labels = torch.tensor([0, 1, 0])
+    label_mask = torch.tensor([True, False, True])
+    edge_index = torch.tensor([[0, 0], [1, 2]])
+    edge_type = torch.full((2,), RELATIONS.index("followers"))
+
+    store = GraphFeatureStore(node_features, labels, label_mask, ["followers"]).build(edge_index, edge_type)
+    assert store.features()[0, 2].item() == 0.0
+
+
+def test_features_for_node_subset_and_roundtrip(tmp_path):
+    graph = synthetic_graph(seed=2)
+    store = GraphFeatureStore(*graph[:3], relations=RELATIONS_USED).build(*graph[3:])
+    nodes = [5, 0, 17]
+    assert torch.equal(store.features(nodes), store.features()[nodes])
+    assert len(store.feature_names()) == store.features().shape[1]
+
+    store.save(tmp_path / "graph_features.pt")
+    loaded = GraphFeatureStore.load(tmp_path / "graph_features.pt")
+    assert torch.equal(loaded.features(), store.features())
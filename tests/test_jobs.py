@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+
+from src.jobs import JobManager
+from src.serialization import RESULT_FIELDS
+
+
+def fake_score(usernames):
+    return [{"username": u, **{name: None for name in RESULT_FIELDS}, "prediction": "HUMAN", "error": None}
+            for u in usernames]
+
+
+def wait_for(manager, job_id, status="completed", timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        current = manager.status(job_id)
+        if current is not None and current["status"] == status:
+            return current
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {status}: {manager.status(job_id)}")
+
+
+def read_rows(manager, job_id):
+    return [json.loads(line) for line in manager.results_path(job_id).read_text().splitlines()]
+
+
+def test_submit_runs_to_completion(tmp_path):
+    manager = JobManager(fake_score, root=tmp_path, chunk_size=3)
+    usernames = [f"user_{i}" for i in range(10)]
+    queued = manager.submit(usernames, {"prediction"})
+    assert queued["status"] == "queued" and queued["total"] == 10
+
+    status = wait_for(manager, queued["job_id"])
+    assert status["processed"] == 10 and status["errors"] == 0
+    rows = read_rows(manager, queued["job_id"])
+    assert [row["username"] for row in rows] == usernames
+    assert set(rows[0]) == {"username", "prediction", "error"}
+    manager.shutdown()
+
+
+def test_unknown_job_ids(tmp_path):
+    manager = JobManager(fake_score, root=tmp_path)
+    assert manager.status("0" * 32) is None
+    assert manager.status("../etc") is None
+    manager.shutdown()
+
+
+def test_resume_after_restart_drops_partial_chunk(tmp_path):
+    # A job a previous process left running: two rows recorded, then a crash mid-write
+    job_id = "a" * 32
+    usernames = [f"user_{i}" for i in range(5)]
+    job_dir = tmp_path / job_id
+    job_dir.mkdir()
+    (job_dir / "input.json").write_text(json.dumps({"usernames": usernames, "fields": None}))
+    (job_dir / "status.json").write_text(json.dumps({
+        "job_id": job_id, "status": "running", "total": 5, "processed": 2,
+        "errors": 0, "shared": None, "error": None
+    }))
+    recorded = "".join(json.dumps(row) + "\n" for row in fake_score(usernames[:2]))
+    (job_dir / "results.jsonl").write_text(recorded + '{"username": "use')
+
+    manager = JobManager(fake_score, root=tmp_path, chunk_size=2)
+    status = wait_for(manager, job_id)
+    assert status["processed"] == 5
+    assert [row["username"] for row in read_rows(manager, job_id)] == usernames
+    manager.shutdown()
+
+
+def test_rows_offset(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"b": 22}\n{"c"')
+    assert JobManager._rows_offset(path, 0) == 0
+    assert JobManager._rows_offset(path, 1) == 9
+    assert JobManager._rows_offset(path, 2) == 19
+    # Asking past the end stops at the partial line's end
+    assert JobManager._rows_offset(path, 5) == 23
+
+
+def test_download_while_running_sends_only_processed_rows(tmp_path):
+    from fastapi.testclient import TestClient
+    import src.app
+
+    release = threading.Event()
+
+    def gated_score(usernames):
+        if usernames[0] != "user_0":
+            release.wait(timeout=10)
+        return fake_score(usernames)
+
+    manager = JobManager(gated_score, root=tmp_path, chunk_size=3)
+    saved, src.app._jobs = src.app._jobs, manager
+    try:
+        client = TestClient(src.app.app)
+        usernames = [f"user_{i}" for i in range(7)]
+        job_id = client.post("/jobs", json={"usernames": usernames}).json()["job_id"]
+        wait_for(manager, job_id, status="running")
+        deadline = time.monotonic() + 10
+        while manager.status(job_id)["processed"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # A chunk the worker is halfway through writing
+        recorded = manager.results_path(job_id).read_bytes()
+        with open(manager.results_path(job_id), "ab") as out:
+            out.write(b'{"username": "user_3"')
+
+        partial = client.get(f"/jobs/{job_id}/results")
+        assert partial.status_code == 200
+        assert partial.headers["X-Job-Status"] == "running"
+        assert int(partial.headers["Content-Length"]) == len(partial.content)
+        assert [json.loads(line)["username"] for line in partial.text.splitlines()] == usernames[:3]
+
+        manager.results_path(job_id).write_bytes(recorded)
+        release.set()
+        wait_for(manager, job_id)
+        complete = client.get(f"/jobs/{job_id}/results")
+        assert complete.headers["X-Job-Status"] == "completed"
+        assert int(complete.headers["Content-Length"]) == len(complete.content)
+        assert [json.loads(line)["username"] for line in complete.text.splitlines()] == usernames
+    finally:
+        release.set()
+        manager.shutdown()
+        src.app._jobs = saved
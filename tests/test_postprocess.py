@@ -0,0 +1,51 @@
+import torch
+
+from src.features import FEATURE_NAMES, NUM_FEATURES, PLACEHOLDER_INDICES
+from src.postprocess import RADAR_INDICES, RADAR_LABELS, class_attributions, top_features, radar_payloads
+
+
+def reference_top_features(class_shap, k=5):
+    """Per-row loop the detector used before the batched post-processing stage"""
+    feature_importance = []
+    for i, name in enumerate(FEATURE_NAMES):
+        if i not in PLACEHOLDER_INDICES:
+            feature_importance.append({"feature": name, "importance": float(class_shap[i])})
+    feature_importance.sort(key=lambda x: abs(x["importance"]), reverse=True)
+    return feature_importance[:k]
+
+
+def test_class_attributions_pick_predicted_class():
+    shap_values = torch.randn(4, NUM_FEATURES, 2)
+    predictions = torch.tensor([0, 1, 1, 0])
+    attributions = class_attributions(shap_values, predictions)
+    assert attributions.shape == (4, NUM_FEATURES)
+    for row, prediction in enumerate(predictions.tolist()):
+        assert torch.equal(attributions[row], shap_values[row, :, prediction])
+
+
+def test_top_features_match_reference_loop():
+    torch.manual_seed(0)
+    attributions = torch.randn(64, NUM_FEATURES, dtype=torch.float64)
+    batched = top_features(attributions, k=5)
+    for row, expected in zip(attributions, batched):
+        assert reference_top_features(row, k=5) == expected
+
+
+def test_top_features_never_return_placeholders():
+    attributions = torch.zeros(3, NUM_FEATURES)
+    attributions[:, PLACEHOLDER_INDICES] = 100.0
+    placeholders = {FEATURE_NAMES[i] for i in PLACEHOLDER_INDICES}
+    for row in top_features(attributions, k=5):
+        assert len(row) == 5
+        assert not placeholders & {f["feature"] for f in row}
+
+
+def test_radar_payloads_per_row():
+    features = torch.randn(3, NUM_FEATURES)
+    payloads = radar_payloads(features, [1.0] * 6, [2.0] * 6)
+    assert len(payloads) == 3
+    for row, payload in zip(features, payloads):
+        assert payload["labels"] == RADAR_LABELS
+        assert payload["user"] == row[RADAR_INDICES].tolist()
+        assert payload["avg_bot"] == [1.0] * 6
+        assert payload["avg_human"] == [2.0] * 6
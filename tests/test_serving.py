@@ -0,0 +1,106 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.benchmark_serving import FAILING_PREFIX, FIXED_PROFILES, THROUGHPUT_FLOORS, measure_batch, serving_client
+
+GOLDEN_PATH = Path(__file__).parent / "golden_predictions.json"
+FIXED = list(FIXED_PROFILES)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with serving_client() as client:
+        yield client
+
+
+def locked_fields(result):
+    """The parts of a prediction that must not change without a deliberate golden update"""
+    return {
+        "prediction": result["prediction"],
+        "bot_probability": result["bot_probability"],
+        "human_probability": result["human_probability"],
+        "top_features": [f["feature"] for f in result["top_features"]],
+        "radar_user": result["radar_data"]["user"],
+    }
+
+
+def assert_same_prediction(actual, expected, abs=1e-5):
+    assert actual["prediction"] == expected["prediction"]
+    assert actual["bot_probability"] == pytest.approx(expected["bot_probability"], abs=abs)
+    assert actual["human_probability"] == pytest.approx(expected["human_probability"], abs=abs)
+    assert actual["top_features"] == expected["top_features"]
+    assert actual["radar_user"] == pytest.approx(expected["radar_user"], abs=abs)
+
+
+def test_predictions_match_golden(client):
+    actual = {username: locked_fields(client.post("/predict", json={"username": username}).json())
+              for username in FIXED}
+    if os.getenv("BOT_SHIELD_UPDATE_GOLDEN") == "1":
+        GOLDEN_PATH.write_text(json.dumps(actual, indent=2) + "\n")
+        pytest.skip(f"Wrote {GOLDEN_PATH.name}; review and commit it")
+    assert GOLDEN_PATH.exists(), f"{GOLDEN_PATH.name} is missing; regenerate with BOT_SHIELD_UPDATE_GOLDEN=1"
+
+    golden = json.loads(GOLDEN_PATH.read_text())
+    assert sorted(golden) == sorted(actual)
+    for username in FIXED:
+        assert_same_prediction(actual[username], golden[username])
+
+
+def test_repeated_predictions_identical(client):
+    first = client.post("/predict", json={"username": "fixed_human"}).json()
+    second = client.post("/predict", json={"username": "fixed_human"}).json()
+    assert first == second
+
+
+def test_batch_matches_single(client):
+    # Pad with other users so the fixed profiles are scored inside a real batch
+    usernames = FIXED + [f"filler_{i}" for i in range(32)]
+    payload = client.post("/predict/batch", json={"usernames": usernames}).json()
+    batch = payload["results"]
+    assert [row["username"] for row in batch] == usernames
+
+    for row in batch[:len(FIXED)]:
+        assert row["error"] is None
+        single = client.post("/predict", json={"username": row["username"]}).json()
+        assert_same_prediction(locked_fields(row), locked_fields(single), abs=1e-6)
+        assert row["profile_data"] == single["profile_data"]
+        assert payload["shared"]["radar"]["labels"] == single["radar_data"]["labels"]
+
+
+def test_batch_order_does_not_change_results(client):
+    forward = client.post("/predict/batch", json={"usernames": FIXED}).json()["results"]
+    backward = client.post("/predict/batch", json={"usernames": FIXED[::-1]}).json()["results"]
+    for row, other in zip(forward, reversed(backward)):
+        assert_same_prediction(locked_fields(row), locked_fields(other), abs=1e-6)
+
+
+def test_failed_scrapes_are_not_recorded(client):
+    username = FAILING_PREFIX + "account"
+    single = client.post("/predict", json={"username": username}).json()
+    assert single["live"] is False
+    batch = client.post("/predict/batch", json={"usernames": [username, "fixed_human"]}).json()["results"]
+    assert [row["live"] for row in batch] == [False, True]
+
+    lookup = client.post("/verdicts/lookup", json={"usernames": [username, "fixed_human"]}).json()
+    assert lookup["missing"] == [username]
+    cached = client.post("/predict", params={"max_age": 3600}, json={"username": username}).json()
+    assert "cached" not in cached
+
+
+@pytest.mark.parametrize("size", sorted(THROUGHPUT_FLOORS))
+def test_batch_throughput_floor(client, size):
+    assert measure_batch(client, size) >= THROUGHPUT_FLOORS[size]
+
+
+def test_failed_scrapes_do_not_feed_drift(client):
+    import src.app
+
+    monitor = src.app.get_detector().drift_monitor
+    before = monitor.observed
+    client.post("/predict", json={"username": FAILING_PREFIX + "drift"})
+    assert monitor.observed == before
+    client.post("/predict/batch", json={"usernames": [FAILING_PREFIX + "drift", "fixed_human", "fixed_bot"]})
+    assert monitor.observed == before + 2
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import torch
+
+from src.shap_report import QuantileSketch, dataset_batches
+from src.sharded_data import write_shards
+
+QUANTILES = [0.0, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 1.0]
+
+
+def sample_columns(num_rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([
+        rng.lognormal(0, 2, num_rows),                                        # positive, heavy-tailed
+        rng.normal(0, 1, num_rows) * np.exp(rng.normal(0, 2, num_rows)),      # mixed sign
+        np.where(rng.random(num_rows) < 0.7, 0.0, rng.normal(0, 1, num_rows)),  # mostly zeros
+        -rng.lognormal(0, 1, num_rows),                                       # negative only
+    ], axis=1)
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_quantiles_within_relative_accuracy(relative_accuracy):
+    values = sample_columns()
+    sketch = QuantileSketch(values.shape[1], relative_accuracy=relative_accuracy)
+    for start in range(0, values.shape[0], 700):
+        sketch.update(values[start:start + 700])
+
+    for q in QUANTILES:
+        # The sketch returns the value at rank floor(q * (n - 1)), i.e. numpy's "lower" quantile
+        expected = np.quantile(values, q, axis=0, method="lower")
+        assert np.all(np.abs(sketch.quantile(q) - expected) <= relative_accuracy * np.abs(expected)), q
+
+
+def test_zero_quantiles_are_exact():
+    values = np.zeros((100, 2))
+    values[:10, 0] = -1.0
+    values[-10:, 1] = 2.0
+    sketch = QuantileSketch(2)
+    sketch.update(values)
+    assert np.array_equal(sketch.quantile(0.5), [0.0, 0.0])
+
+
+def test_shard_batches_cover_every_row_in_order(tmp_path):
+    X = torch.randn(250, 23)
+    y = torch.randint(0, 2, (250,))
+    write_shards(X[:180], y[:180], tmp_path / "train", shard_size=70)
+    write_shards(X[180:], y[180:], tmp_path / "test", shard_size=70)
+
+    num_rows, batches = dataset_batches(64, shard_dir=tmp_path)
+    batches = list(batches)
+    assert num_rows == 250
+    assert max(batch.shape[0] for batch in batches) <= 64
+    assert torch.equal(torch.cat(batches), X)
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+import torch
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score
+
+from src.sharded_data import ShardedDataset, StreamingEvaluator, prefetch, sharded_loader, write_shards
+
+NUM_ROWS = 250
+
+
+@pytest.fixture(scope="module")
+def shard_dir(tmp_path_factory):
+    # Column 0 is the row id, so every yielded row can be traced back
+    X = torch.randn(NUM_ROWS, 23)
+    X[:, 0] = torch.arange(NUM_ROWS, dtype=torch.float32)
+    y = torch.arange(NUM_ROWS) % 2
+    path = tmp_path_factory.mktemp("shards")
+    write_shards(X, y, path, shard_size=30)
+    return path
+
+
+def row_ids(batches):
+    ids, labels = [], []
+    for X, y in batches:
+        ids += X[:, 0].long().tolist()
+        labels += y.tolist()
+    assert labels == [i % 2 for i in ids]
+    return ids
+
+
+def test_streaming_evaluator_matches_sklearn():
+    generator = torch.Generator().manual_seed(0)
+    labels = torch.randint(0, 2, (1000,), generator=generator)
+    preds = torch.randint(0, 2, (1000,), generator=generator)
+
+    evaluator = StreamingEvaluator()
+    for start in range(0, 1000, 64):
+        evaluator.update(preds[start:start + 64], labels[start:start + 64])
+
+    assert evaluator.confusion.tolist() == confusion_matrix(labels, preds).tolist()
+    expected = (accuracy_score(labels, preds), precision_score(labels, preds),
+                recall_score(labels, preds), f1_score(labels, preds))
+    assert evaluator.metrics() == pytest.approx(expected, abs=1e-12)
+
+
+def test_streaming_evaluator_without_positive_predictions():
+    evaluator = StreamingEvaluator()
+    evaluator.update(torch.zeros(4), torch.tensor([0, 1, 0, 1]))
+    assert evaluator.metrics() == pytest.approx((0.5, 0.0, 0.0, 0.0))
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_every_row_once_per_epoch(shard_dir, shuffle, num_workers):
+    loader = sharded_loader(shard_dir, batch_size=16, shuffle=shuffle, num_workers=num_workers)
+    for epoch in range(2):
+        loader.dataset.set_epoch(epoch)
+        ids = row_ids(loader)
+        assert sorted(ids) == list(range(NUM_ROWS))
+        if not shuffle and num_workers == 0:
+            assert ids == list(range(NUM_ROWS))
+
+
+def test_shard_order_changes_with_epoch(shard_dir):
+    dataset = ShardedDataset(shard_dir, batch_size=16)
+    orders = []
+    for epoch in (0, 0, 1):
+        dataset.set_epoch(epoch)
+        orders.append(dataset._shard_order()[0])
+    assert orders[0] == orders[1]
+    assert orders[0] != orders[2]
+    assert sorted(orders[0]) == sorted(orders[2])
+
+
+def test_prefetch_yields_everything_and_reraises():
+    assert list(prefetch(iter(range(50)), depth=3)) == list(range(50))
+
+    def failing():
+        yield 1
+        raise RuntimeError("bad shard")
+
+    with pytest.raises(RuntimeError, match="bad shard"):
+        list(prefetch(failing()))
+
+
+def test_prefetch_producer_exits_when_consumer_stops_early():
+    items = prefetch(iter(range(1000)), depth=2)
+    assert next(items) == 0
+    # Let the producer fill the queue and block on it
+    time.sleep(0.05)
+    items.close()
+
+    deadline = time.monotonic() + 5
+    while any(t.name == "prefetch" for t in threading.enumerate()):
+        assert time.monotonic() < deadline, "prefetch producer still running"
+        time.sleep(0.01)
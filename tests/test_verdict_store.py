@@ -0,0 +1,66 @@
+import numpy as np
+
+import src.verdict_store as verdict_store
+from src.verdict_store import VerdictStore, hash_username
+
+
+def test_handles_are_normalized():
+    assert hash_username("@Alice ") == hash_username("alice")
+    assert hash_username("alice") != hash_username("bob")
+
+
+def test_latest_verdict_wins_within_buffer():
+    store = VerdictStore(segment_size=8)
+    store.record(["a", "b"], [0.9, 0.2], [1, 0], scored_at=100)
+    store.record(["a"], [0.1], [0], scored_at=200)
+    found, bot_prob, prediction, scored_at = store.lookup(["a", "b", "c"])
+    assert found.tolist() == [True, True, False]
+    assert bot_prob[0] == np.float32(0.1) and prediction[0] == 0 and scored_at[0] == 200
+
+
+def test_latest_verdict_wins_when_sealed_together():
+    store = VerdictStore(segment_size=4)
+    store.record(["a", "x", "a", "y"], [0.9, 0.5, 0.3, 0.5], [1, 0, 0, 0], scored_at=100)
+    assert store.metrics()["segments"] == 1 and len(store) == 3
+    found, bot_prob, _, _ = store.lookup(["a"])
+    assert found[0] and bot_prob[0] == np.float32(0.3)
+
+
+def test_newer_segment_and_buffer_shadow_older_segments():
+    store = VerdictStore(segment_size=2)
+    store.record(["a", "b"], [0.9, 0.9], [1, 1], scored_at=100)   # segment 1
+    store.record(["a", "c"], [0.4, 0.4], [0, 0], scored_at=200)   # segment 2
+    store.record(["b"], [0.2], [0], scored_at=300)                # buffer
+    found, bot_prob, _, scored_at = store.lookup(["a", "b", "c"])
+    assert found.all()
+    assert bot_prob.tolist() == [np.float32(0.4), np.float32(0.2), np.float32(0.4)]
+    assert scored_at.tolist() == [200, 300, 200]
+
+
+def test_max_age_treats_stale_verdicts_as_missing(monkeypatch):
+    store = VerdictStore(segment_size=8)
+    now = 1_000_000
+    store.record(["old"], [0.9], [1], scored_at=now - 7200)
+    store.record(["new"], [0.9], [1], scored_at=now - 10)
+
+    monkeypatch.setattr(verdict_store.time, "time", lambda: now)
+    found, _, _, _ = store.lookup(["old", "new"], max_age=3600)
+    assert found.tolist() == [False, True]
+
+
+def test_eviction_drops_whole_oldest_segments():
+    store = VerdictStore(capacity=4, segment_size=2)
+    for i in range(4):
+        store.record([f"u{2 * i}", f"u{2 * i + 1}"], [0.5, 0.5], [0, 0], scored_at=100 + i)
+    metrics = store.metrics()
+    assert metrics["segments"] == 2 and metrics["evicted"] == 4 and len(store) == 4
+    found, _, _, _ = store.lookup([f"u{i}" for i in range(8)])
+    assert found.tolist() == [False] * 4 + [True] * 4
+
+
+def test_hit_and_miss_counters():
+    store = VerdictStore(segment_size=8)
+    store.record(["a"], [0.5], [0])
+    store.lookup(["a", "b", "c"])
+    metrics = store.metrics()
+    assert metrics["hits"] == 1 and metrics["misses"] == 2